@@ -0,0 +1,40 @@
+"""sessions overlap index and no-double-booking exclusion constraint
+
+Revision ID: 3f9a1c2d7b4e
+Revises: fd0b9f7996c4
+Create Date: 2025-08-12 10:04:31.512877
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9a1c2d7b4e'
+down_revision: Union[str, Sequence[str], None] = 'fd0b9f7996c4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # btree_gist lets the scalar tutor_id share a GiST index with the time range
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    op.create_index(
+        'ix_sessions_tutor_id_start_time_end_time',
+        'sessions',
+        ['tutor_id', 'start_time', 'end_time'],
+        unique=False,
+    )
+    # fails if existing rows already overlap; clean those up before upgrading
+    op.execute(
+        "ALTER TABLE sessions ADD CONSTRAINT ex_sessions_tutor_id_no_overlap "
+        "EXCLUDE USING gist (tutor_id WITH =, tstzrange(start_time, end_time) WITH &&)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("ALTER TABLE sessions DROP CONSTRAINT ex_sessions_tutor_id_no_overlap")
+    op.drop_index('ix_sessions_tutor_id_start_time_end_time', table_name='sessions')
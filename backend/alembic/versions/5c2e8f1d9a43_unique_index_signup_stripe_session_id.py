@@ -0,0 +1,33 @@
+"""unique index on session_signups.stripe_session_id
+
+Revision ID: 5c2e8f1d9a43
+Revises: a7d3c9e2b6f1
+Create Date: 2025-08-18 10:12:47.502113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c2e8f1d9a43'
+down_revision: Union[str, Sequence[str], None] = 'a7d3c9e2b6f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # NULLs are distinct, so signups without a checkout are unaffected
+    op.create_index(
+        'uq_session_signups_stripe_session_id',
+        'session_signups',
+        ['stripe_session_id'],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_session_signups_stripe_session_id', table_name='session_signups')
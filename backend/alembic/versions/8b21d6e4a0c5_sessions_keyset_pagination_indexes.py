@@ -0,0 +1,34 @@
+"""sessions keyset pagination indexes
+
+Revision ID: 8b21d6e4a0c5
+Revises: 3f9a1c2d7b4e
+Create Date: 2025-08-12 14:37:02.208145
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b21d6e4a0c5'
+down_revision: Union[str, Sequence[str], None] = '3f9a1c2d7b4e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_sessions_start_time_id', 'sessions', ['start_time', 'id'], unique=False)
+    op.create_index(
+        'ix_sessions_session_type_start_time_id',
+        'sessions',
+        ['session_type', 'start_time', 'id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_sessions_session_type_start_time_id', table_name='sessions')
+    op.drop_index('ix_sessions_start_time_id', table_name='sessions')
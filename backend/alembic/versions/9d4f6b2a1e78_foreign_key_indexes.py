@@ -0,0 +1,52 @@
+"""foreign key indexes on session_signups and bookings
+
+Revision ID: 9d4f6b2a1e78
+Revises: 5c2e8f1d9a43
+Create Date: 2025-08-19 09:26:51.340287
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d4f6b2a1e78'
+down_revision: Union[str, Sequence[str], None] = '5c2e8f1d9a43'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# sessions.tutor_id and sessions.session_type are already the leading columns
+# of ix_sessions_tutor_id_start_time_end_time / ix_sessions_session_type_start_time_id
+INDEXES = [
+    ('ix_session_signups_session_id', 'session_signups', ['session_id']),
+    ('ix_session_signups_student_id', 'session_signups', ['student_id']),
+    ('ix_bookings_user_id', 'bookings', ['user_id']),
+    ('ix_bookings_session_id', 'bookings', ['session_id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY avoids blocking writes while the index builds, but cannot
+    # run inside a transaction; IF NOT EXISTS makes a retried run safe
+    # (drop any INVALID index a failed build leaves behind first).
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name, table, columns,
+                unique=False,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(
+                name, table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
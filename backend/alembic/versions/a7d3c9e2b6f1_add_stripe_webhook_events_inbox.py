@@ -0,0 +1,49 @@
+"""add stripe_webhook_events inbox
+
+Revision ID: a7d3c9e2b6f1
+Revises: e1b5a8c3f2d7
+Create Date: 2025-08-15 16:40:09.117652
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d3c9e2b6f1'
+down_revision: Union[str, Sequence[str], None] = 'e1b5a8c3f2d7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('stripe_webhook_events',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('event_id', sa.String(), nullable=False),
+    sa.Column('event_type', sa.String(), nullable=False),
+    sa.Column('payload', sa.JSON(), nullable=False),
+    sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('last_error', sa.String(), nullable=True),
+    sa.Column('received_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('processed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('event_id')
+    )
+    op.create_index(op.f('ix_stripe_webhook_events_id'), 'stripe_webhook_events', ['id'], unique=False)
+    op.create_index(
+        'ix_stripe_webhook_events_pending',
+        'stripe_webhook_events',
+        ['id'],
+        unique=False,
+        postgresql_where=sa.text('processed_at IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_stripe_webhook_events_pending', table_name='stripe_webhook_events')
+    op.drop_index(op.f('ix_stripe_webhook_events_id'), table_name='stripe_webhook_events')
+    op.drop_table('stripe_webhook_events')
@@ -0,0 +1,36 @@
+"""add cache_invalidations
+
+Revision ID: b3e8d1f5c7a2
+Revises: 9d4f6b2a1e78
+Create Date: 2025-08-22 11:05:41.530218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3e8d1f5c7a2'
+down_revision: Union[str, Sequence[str], None] = '9d4f6b2a1e78'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # only read in "poll" invalidation mode; Postgres deployments use LISTEN/NOTIFY
+    op.create_table('cache_invalidations',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('payload', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_cache_invalidations_created_at'), 'cache_invalidations', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_cache_invalidations_created_at'), table_name='cache_invalidations')
+    op.drop_table('cache_invalidations')
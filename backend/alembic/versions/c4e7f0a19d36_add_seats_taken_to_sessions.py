@@ -0,0 +1,37 @@
+"""add seats_taken counter to sessions
+
+Revision ID: c4e7f0a19d36
+Revises: 8b21d6e4a0c5
+Create Date: 2025-08-13 09:21:45.730114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e7f0a19d36'
+down_revision: Union[str, Sequence[str], None] = '8b21d6e4a0c5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'sessions',
+        sa.Column('seats_taken', sa.Integer(), nullable=False, server_default='0'),
+    )
+    # backfill from the signups that already exist
+    op.execute(
+        "UPDATE sessions SET seats_taken = ("
+        "SELECT count(*) FROM session_signups "
+        "WHERE session_signups.session_id = sessions.id)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('sessions', 'seats_taken')
@@ -0,0 +1,45 @@
+"""add hold_expires_at to session_signups
+
+Revision ID: e1b5a8c3f2d7
+Revises: c4e7f0a19d36
+Create Date: 2025-08-14 11:02:18.964301
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1b5a8c3f2d7'
+down_revision: Union[str, Sequence[str], None] = 'c4e7f0a19d36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'session_signups',
+        sa.Column('hold_expires_at', sa.DateTime(timezone=True), nullable=True),
+    )
+    # existing signups still waiting on a checkout get the default hold
+    # measured from their creation; free signups never hold
+    op.execute(
+        "UPDATE session_signups SET hold_expires_at = created_at + interval '40 minutes' "
+        "WHERE NOT is_paid AND stripe_session_id IS NOT NULL"
+    )
+    op.create_index(
+        'ix_session_signups_unpaid_hold_expires_at',
+        'session_signups',
+        ['hold_expires_at'],
+        unique=False,
+        postgresql_where=sa.text('NOT is_paid AND stripe_session_id IS NOT NULL'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_session_signups_unpaid_hold_expires_at', table_name='session_signups')
+    op.drop_column('session_signups', 'hold_expires_at')
@@ -0,0 +1,125 @@
+# backend/app/auth.py
+"""
+Local bearer-token verification.
+
+Tokens are checked against a JSON Web Key Set held in memory, so verifying
+one costs a signature check and no network or database round trip. The set
+comes from JWT_JWKS or JWT_JWKS_FILE; a file is re-read every
+JWT_JWKS_REFRESH_SECONDS, and immediately (rate-limited) when a token names
+a key id we have not seen, so rotated keys are picked up without a restart.
+File reads run in a worker thread so a slow disk never stalls the event loop.
+"""
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass
+
+import jwt
+
+from .config import settings
+from .models import UserRole
+
+logger = logging.getLogger(__name__)
+
+# floor between forced reloads triggered by unknown key ids
+UNKNOWN_KID_RELOAD_SECONDS = 5.0
+
+class AuthError(Exception):
+    """Missing, malformed or untrusted credentials; surfaced to clients as 401."""
+
+class KeysUnavailable(Exception):
+    """No key set could be loaded, so no token can be checked; surfaced as 503."""
+
+@dataclass(frozen=True, slots=True)
+class CurrentUser:
+    """What handlers get from get_current_user; safe to cache across requests."""
+    id:    int
+    email: str
+    name:  str
+    role:  UserRole
+
+class KeySet:
+    def __init__(
+        self,
+        *,
+        jwks: str | None = None,
+        jwks_file: str | None = None,
+        refresh_seconds: float = 300.0,
+    ):
+        self.jwks = jwks
+        self.jwks_file = jwks_file
+        self.refresh_seconds = refresh_seconds
+        self._keys: dict[str | None, jwt.PyJWK] = {}
+        self._loaded_at: float | None = None
+        self._lock = asyncio.Lock()
+
+    def _read(self) -> dict:
+        if self.jwks_file:
+            with open(self.jwks_file, encoding="utf-8") as fh:
+                return json.load(fh)
+        if self.jwks:
+            return json.loads(self.jwks)
+        raise AuthError("Token verification is not configured")
+
+    async def reload(self) -> None:
+        try:
+            data = await asyncio.to_thread(self._read) if self.jwks_file else self._read()
+            keys = jwt.PyJWKSet.from_dict(data).keys
+        except (OSError, ValueError, jwt.PyJWKSetError) as exc:
+            if not self._keys:
+                raise KeysUnavailable("Token verification is unavailable") from exc
+            # a half-written or briefly missing file must not lock everyone out
+            logger.exception("JWKS reload failed; keeping the previous key set")
+        else:
+            self._keys = {key.key_id: key for key in keys}
+        self._loaded_at = time.monotonic()
+
+    def _age(self) -> float:
+        return float("inf") if self._loaded_at is None else time.monotonic() - self._loaded_at
+
+    async def _reload_if_older(self, seconds: float) -> None:
+        # one reload at a time; requests that queued behind it find it done
+        async with self._lock:
+            if self._age() >= seconds:
+                await self.reload()
+
+    async def signing_key(self, kid: str | None) -> jwt.PyJWK:
+        if self._age() >= self.refresh_seconds:
+            await self._reload_if_older(self.refresh_seconds)
+        if kid is None and len(self._keys) == 1:
+            return next(iter(self._keys.values()))
+        key = self._keys.get(kid)
+        if key is None and self._age() >= UNKNOWN_KID_RELOAD_SECONDS:
+            await self._reload_if_older(UNKNOWN_KID_RELOAD_SECONDS)
+            key = self._keys.get(kid)
+        if key is None:
+            raise AuthError("Unknown signing key")
+        return key
+
+keyset = KeySet(
+    jwks=settings.JWT_JWKS,
+    jwks_file=settings.JWT_JWKS_FILE,
+    refresh_seconds=settings.JWT_JWKS_REFRESH_SECONDS,
+)
+
+async def verify_token(token: str, keys: KeySet | None = None) -> dict:
+    """Return the token's claims, or raise AuthError (or KeysUnavailable)."""
+    keys = keys or keyset
+    try:
+        header = jwt.get_unverified_header(token)
+        key = await keys.signing_key(header.get("kid"))
+        return jwt.decode(
+            token,
+            key.key,
+            algorithms=settings.JWT_ALGORITHMS,
+            audience=settings.JWT_AUDIENCE,
+            issuer=settings.JWT_ISSUER,
+            leeway=settings.JWT_LEEWAY_SECONDS,
+            options={
+                "require": ["exp", settings.JWT_EMAIL_CLAIM],
+                "verify_aud": settings.JWT_AUDIENCE is not None,
+            },
+        )
+    except jwt.PyJWTError as exc:
+        raise AuthError(f"Invalid token: {exc}") from exc
@@ -0,0 +1,122 @@
+# backend/app/availability.py
+"""
+Sorted-interval availability engine.
+
+Booked sessions are normalised to aware UTC intervals, sorted and merged once,
+then swept alongside the (already ordered) candidate slots. Total cost is
+O(sessions log sessions + slots) instead of O(slots × sessions).
+
+Each tutor's busy intervals are cached per UTC day in busy_cache; the
+session-creating write paths evict the days they touch via
+invalidate_busy once their transaction commits, in every worker.
+"""
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, time, timezone
+from typing import Iterable, Iterator
+
+from .cache import TTLCache
+from .invalidation import invalidate_after_commit, register
+from .config import settings
+
+WORK_START = time(hour=6)
+WORK_END   = time(hour=22)
+SLOT_MINUTES = 60
+
+
+@dataclass(frozen=True, slots=True)
+class Slot:
+    start: datetime
+    end:   datetime
+
+
+def as_utc(dt: datetime) -> datetime:
+    """Treat naive datetimes (e.g. from SQLite) as UTC and normalise the rest."""
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def merge_intervals(
+    intervals: Iterable[tuple[datetime, datetime]],
+) -> list[tuple[datetime, datetime]]:
+    """Sort intervals by start and collapse overlapping/touching ones."""
+    ordered = sorted(
+        (as_utc(s), as_utc(e)) for s, e in intervals if e > s
+    )
+    merged: list[tuple[datetime, datetime]] = []
+    for start, end in ordered:
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def candidate_slots(
+    start: datetime,
+    end: datetime,
+    slot_minutes: int = SLOT_MINUTES,
+) -> Iterator[Slot]:
+    """Yield the fixed-length slots between start and end inside working hours."""
+    step = timedelta(minutes=slot_minutes)
+    cur = start
+    while cur < end:
+        if WORK_START <= cur.time() < WORK_END:
+            yield Slot(cur, cur + step)
+        cur += step
+
+
+def free_slots(
+    start: datetime,
+    end: datetime,
+    booked: Iterable[tuple[datetime, datetime]],
+    slot_minutes: int = SLOT_MINUTES,
+) -> list[Slot]:
+    """
+    Return the working-hour slots in [start, end) that do not overlap any
+    booked interval. Slots keep the caller's timezone; comparisons are done
+    on UTC timestamps so mixed offsets behave correctly.
+    """
+    merged = merge_intervals(booked)
+    free: list[Slot] = []
+    i = 0
+    for slot in candidate_slots(start, end, slot_minutes):
+        slot_start = as_utc(slot.start)
+        slot_end   = as_utc(slot.end)
+        # skip booked intervals that finish before this slot begins
+        while i < len(merged) and merged[i][1] <= slot_start:
+            i += 1
+        if i < len(merged) and merged[i][0] < slot_end:
+            continue
+        free.append(slot)
+    return free
+
+
+# busy_key(tutor_id, UTC date) -> that day's busy intervals, as aware UTC pairs
+busy_cache = register("availability", TTLCache(
+    settings.AVAILABILITY_CACHE_SIZE, ttl=settings.AVAILABILITY_CACHE_TTL_SECONDS
+))
+
+
+def busy_key(tutor_id: int, day: date) -> tuple[int, str]:
+    return tutor_id, day.isoformat()
+
+
+def utc_days(start: datetime, end: datetime) -> list[date]:
+    """The UTC calendar days that [start, end) touches."""
+    first = as_utc(start).date()
+    last = (as_utc(end) - timedelta(microseconds=1)).date()
+    return [first + timedelta(days=i) for i in range((last - first).days + 1)]
+
+
+def day_bounds(day: date) -> tuple[datetime, datetime]:
+    start = datetime.combine(day, time(), tzinfo=timezone.utc)
+    return start, start + timedelta(days=1)
+
+
+def invalidate_busy(db, tutor_id: int, start: datetime, end: datetime) -> None:
+    """Evict the tutor's cached days overlapping [start, end) once db commits."""
+    invalidate_after_commit(
+        db, busy_cache, [busy_key(tutor_id, day) for day in utc_days(start, end)]
+    )
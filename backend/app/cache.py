@@ -0,0 +1,262 @@
+# backend/app/cache.py
+"""
+Small in-process caches.
+
+These live per worker process and are only ever touched from the event
+loop, so they need no locking. They front authoritative state in the
+database; losing them (restart, eviction) costs a round trip, never
+correctness. Caches of database state are invalidated by committed
+writes through app.invalidation.
+"""
+import asyncio
+import logging
+import time
+from collections import Counter, OrderedDict
+from collections.abc import Awaitable, Hashable, Iterable
+from functools import partial
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+class LRUCache:
+    """Bounded mapping that evicts the least recently used key when full."""
+
+    def __init__(self, maxsize: int):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self._data: OrderedDict[Hashable, Any] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # bumped by invalidate(); fills compare it to detect a write racing their query
+        self.generation = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Membership test that counts as a use (refreshes recency)."""
+        if key in self._data:
+            self._data.move_to_end(key)
+            self.hits += 1
+            return True
+        self.misses += 1
+        return False
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        value = self._data.get(key, _MISSING)
+        if value is _MISSING:
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any = True) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def add(self, key: Hashable) -> None:
+        """Remember a key with no meaningful value (set semantics)."""
+        self.set(key, True)
+
+    def discard(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def invalidate(self, keys: Iterable[Hashable]) -> None:
+        """Drop keys because the data behind them changed."""
+        self.generation += 1
+        for key in keys:
+            if self._data.pop(key, _MISSING) is not _MISSING:
+                self.invalidations += 1
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+class TTLCache(LRUCache):
+    """LRUCache whose entries also expire `ttl` seconds after they were set."""
+
+    def __init__(self, maxsize: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        super().__init__(maxsize)
+        self.ttl = ttl
+        self._clock = clock
+
+    def _live(self, key: Hashable) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            return _MISSING
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._data[key]
+            return _MISSING
+        self._data.move_to_end(key)
+        return value
+
+    def __contains__(self, key: Hashable) -> bool:
+        found = self._live(key) is not _MISSING
+        if found:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return found
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        value = self._live(key)
+        if value is _MISSING:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any = True) -> None:
+        super().set(key, (self._clock() + self.ttl, value))
+
+class SWRCache(LRUCache):
+    """
+    Cache of async loads with stale-while-revalidate and single-flight.
+
+    An entry is fresh for `ttl` seconds, then served stale for up to
+    `stale_ttl` more while one background task reloads it. Concurrent
+    callers that find nothing usable share a single in-flight load rather
+    than each running their own. Invalidated keys are dropped outright and
+    the next caller loads afresh.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        stale_ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        super().__init__(maxsize)
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._clock = clock
+        self._loads: dict[Hashable, asyncio.Task] = {}
+        self.stale_hits = 0
+        self.coalesced = 0
+        self.loads = 0
+        self.load_errors = 0
+
+    async def get_or_load(self, key: Hashable, load: Callable[[], Awaitable[Any]]) -> Any:
+        entry = self._data.get(key)
+        if entry is not None:
+            fresh_until, stale_until, value = entry
+            now = self._clock()
+            if now < stale_until:
+                self._data.move_to_end(key)
+                if now < fresh_until:
+                    self.hits += 1
+                else:
+                    self.stale_hits += 1
+                    self._start_load(key, load)
+                return value
+        self.misses += 1
+        if key in self._loads:
+            self.coalesced += 1
+        # shielded: a caller that goes away must not cancel everyone's load
+        return await asyncio.shield(self._start_load(key, load))
+
+    def _start_load(self, key: Hashable, load: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        task = self._loads.get(key)
+        if task is None:
+            task = asyncio.create_task(self._load(key, load))
+            task.add_done_callback(self._load_done)
+            self._loads[key] = task
+        return task
+
+    async def _load(self, key: Hashable, load: Callable[[], Awaitable[Any]]) -> Any:
+        generation = self.generation
+        self.loads += 1
+        try:
+            value = await load()
+        finally:
+            if self._loads.get(key) is asyncio.current_task():
+                del self._loads[key]
+        # keep it only if nothing was invalidated while we were loading
+        if self.generation == generation:
+            now = self._clock()
+            self.set(key, (now + self.ttl, now + self.ttl + self.stale_ttl, value))
+        return value
+
+    def _load_done(self, task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            # waiters see the error; background refreshes only leave this trace
+            self.load_errors += 1
+            logger.warning("Cache load failed", exc_info=task.exception())
+
+    def invalidate(self, keys: Iterable[Hashable]) -> None:
+        keys = list(keys)
+        super().invalidate(keys)
+        for key in keys:
+            # later callers must not join a load that may predate the write
+            self._loads.pop(key, None)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            **super().stats(),
+            "stale_hits": self.stale_hits,
+            "coalesced": self.coalesced,
+            "loads": self.loads,
+            "load_errors": self.load_errors,
+            "loads_in_flight": len(self._loads),
+        }
+
+class SingleFlight:
+    """
+    Concurrent do() calls with the same key share one run of their function.
+
+    Nothing is kept once the run finishes; this only collapses identical
+    work that is in flight at the same moment. The run is a task shielded
+    from every caller, so one caller giving up (client disconnect, timeout)
+    neither cancels it for the others nor hands them a cancellation.
+    """
+
+    def __init__(self):
+        self._runs: dict[Hashable, asyncio.Task] = {}
+        self.runs = 0
+        self.coalesced = 0
+        self.coalesced_by: Counter[str] = Counter()
+
+    async def do(
+        self, key: Hashable, fn: Callable[[], Awaitable[Any]], label: str = "other"
+    ) -> Any:
+        task = self._runs.get(key)
+        if task is None:
+            self.runs += 1
+            task = asyncio.create_task(fn())
+            self._runs[key] = task
+            task.add_done_callback(partial(self._done, key))
+        else:
+            self.coalesced += 1
+            self.coalesced_by[label] += 1
+        return await asyncio.shield(task)
+
+    def _done(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._runs.get(key) is task:
+            del self._runs[key]
+        if not task.cancelled():
+            task.exception()    # callers re-raise it; don't warn if they all left
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "coalesced": self.coalesced,
+            "coalesced_by": dict(self.coalesced_by),
+            "in_flight": len(self._runs),
+        }
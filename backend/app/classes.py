@@ -0,0 +1,24 @@
+# backend/app/classes.py
+"""
+Per-worker cache of the class catalogue served by GET /classes.
+
+The whole listing is one entry holding the encoded JSON body. It is
+refreshed in the background once it is CLASSES_CACHE_TTL_SECONDS old
+(stale-while-revalidate, one refresh per worker at a time) and dropped
+when a committed write changes a class or its seat count, in any worker.
+"""
+from .cache import SWRCache
+from .config import settings
+from .invalidation import invalidate_after_commit, register
+
+CATALOG_KEY = "classes"
+
+catalog_cache = register("classes", SWRCache(
+    1,
+    ttl=settings.CLASSES_CACHE_TTL_SECONDS,
+    stale_ttl=settings.CLASSES_CACHE_STALE_SECONDS,
+))
+
+def invalidate_catalog(db) -> None:
+    """Drop the cached catalogue once db's transaction commits."""
+    invalidate_after_commit(db, catalog_cache, [CATALOG_KEY])
@@ -1,19 +1,90 @@
 # app/config.py
+from typing import Literal
+
 from pydantic import PostgresDsn, ConfigDict
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
     DATABASE_URL: PostgresDsn
+    # connection pool, per worker process
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800       # recycle before server/LB idle timeouts
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_PREWARM: int = 5                  # connections opened at startup (<= pool size)
+    DB_STATEMENT_CACHE_SIZE: int = 100        # asyncpg prepared statements per connection
+
+    # optional read replica for GET endpoints (same pool settings as the primary)
+    READ_DATABASE_URL: PostgresDsn | None = None
+    READ_YOUR_WRITES_SECONDS: int = 10        # reads stay on the primary after a write
+    READ_COALESCING: bool = True              # concurrent identical reads share one query
     FRONTEND_URL: str
     STRIPE_API_KEY: str
     STRIPE_WEBHOOK_SECRET: str
+    STRIPE_API_BASE: str | None = None        # point at scripts/fake_stripe.py locally
+    STRIPE_MAX_CONCURRENCY: int = 8           # in-flight Stripe calls per worker
+    STRIPE_TIMEOUT_SECONDS: float = 10.0
+    STRIPE_MAX_RETRIES: int = 2               # transient failures only, jittered backoff
+    STRIPE_BREAKER_FAILURE_THRESHOLD: int = 5
+    STRIPE_BREAKER_RESET_SECONDS: float = 30.0
     PRICE_PER_HOUR_CENTS: int = 3000
 
+    # per-worker cache of busy intervals behind /availability, keyed by (tutor, UTC day);
+    # writes in this worker evict it on commit, the TTL bounds staleness from other workers
+    AVAILABILITY_CACHE_SIZE: int = 10_000
+    AVAILABILITY_CACHE_TTL_SECONDS: float = 300.0
+    # widest start..end one request may ask for; bounds the query and the days it caches
+    AVAILABILITY_MAX_WINDOW_DAYS: int = 62
+    # GET /classes: fresh for TTL, then served stale while one refresh runs in the background
+    CLASSES_CACHE_TTL_SECONDS: float = 30.0
+    CLASSES_CACHE_STALE_SECONDS: float = 300.0
+
+    # cross-worker cache invalidation: "notify" (Postgres LISTEN/NOTIFY), "poll"
+    # (cache_invalidations table), "off", or "auto" (notify on Postgres, else poll)
+    CACHE_INVALIDATION_MODE: Literal["auto", "notify", "poll", "off"] = "auto"
+    CACHE_INVALIDATION_CHANNEL: str = "cache_invalidation"
+    CACHE_INVALIDATION_KEEPALIVE_SECONDS: float = 30.0   # listener connection health check
+    CACHE_INVALIDATION_RETRY_SECONDS: float = 2.0
+    CACHE_INVALIDATION_POLL_SECONDS: float = 1.0
+    CACHE_INVALIDATION_RETENTION_SECONDS: int = 300
+
+    # GET /events (server-sent events): per-client backlog before it is told to resync
+    EVENT_STREAM_QUEUE_SIZE: int = 100
+    EVENT_STREAM_HEARTBEAT_SECONDS: float = 15.0
+
+    # bearer-token auth: tokens are verified locally against a JWKS, given
+    # inline (JWT_JWKS) or as a file (JWT_JWKS_FILE, re-read to pick up rotated keys)
+    JWT_JWKS: str | None = None
+    JWT_JWKS_FILE: str | None = None
+    JWT_JWKS_REFRESH_SECONDS: float = 300.0
+    JWT_ALGORITHMS: list[str] = ["RS256", "ES256"]
+    JWT_ISSUER: str | None = None
+    JWT_AUDIENCE: str | None = None
+    JWT_EMAIL_CLAIM: str = "email"
+    JWT_LEEWAY_SECONDS: int = 30
+    AUTH_COOKIE_NAME: str = "access_token"    # fallback when there is no Authorization header
+    AUTH_USER_CACHE_SECONDS: float = 60.0     # claim → user mapping, per process
+    AUTH_USER_CACHE_SIZE: int = 10_000
+
     # for ad-hoc sessions created by the webhook
     DEFAULT_TUTOR_ID: int = 1
     DEFAULT_ZOOM_LINK: str | None = None
     DEFAULT_DISCORD_INVITE: str | None = None
 
+    # unpaid signups hold a seat only until their checkout can no longer be paid
+    CHECKOUT_EXPIRY_SECONDS: int = 1800       # Stripe's minimum is 30 minutes
+    SEAT_HOLD_TTL_SECONDS: int = 2400         # checkout expiry + webhook grace
+    HOLD_REAPER_INTERVAL_SECONDS: int = 60
+    HOLD_REAPER_BATCH_SIZE: int = 500
+
+    # Stripe webhook inbox workers
+    WEBHOOK_WORKERS: int = 2
+    WEBHOOK_BATCH_SIZE: int = 200
+    WEBHOOK_POLL_INTERVAL_SECONDS: float = 5.0
+    WEBHOOK_MAX_ATTEMPTS: int = 5
+    WEBHOOK_DEDUP_CACHE_SIZE: int = 10_000  # recent event ids remembered per process
+
     model_config = SettingsConfigDict(env_file=".env")
 
 settings = Settings()
\ No newline at end of file
@@ -1,54 +1,158 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, update
-from datetime import datetime
+from sqlalchemy import select, func, and_, update, insert, delete, case, literal, tuple_, any_, bindparam, String
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Row
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased
+from collections import Counter
+from datetime import datetime, timedelta, timezone
 from uuid import uuid4
 
 from . import models, schemas
+from .availability import invalidate_busy
+from .classes import invalidate_catalog
+from .config import settings
+from .events import RESYNC
+from .invalidation import publish_after_commit
+
+def _seats_changed(db: AsyncSession, session_id: int, seats_taken: int) -> None:
+    """
+    After commit: drop the cached class catalogue and push the new count to
+    live clients. An absolute count (not a delta) can be applied twice, or
+    over a snapshot that already includes it, without drifting.
+    """
+    invalidate_catalog(db)
+    publish_after_commit(db, {"type": "seats", "session_id": session_id, "seats_taken": seats_taken})
+
+def _session_created(db: AsyncSession, session: dict) -> None:
+    """After commit: free up the tutor's cached days and push the new session to live clients."""
+    invalidate_busy(db, session["tutor_id"], session["start_time"], session["end_time"])
+    if session["session_type"] == models.SessionType.class_group:
+        invalidate_catalog(db)
+    publish_after_commit(db, {"type": "session", "session": session})
 
 # ── Users ─────────────────────────────────────────
+# Helpers never commit: routers run inside one request-scoped transaction
+# (database.get_uow), and background jobs and scripts commit for themselves.
+#
+# Create helpers INSERT ... RETURNING the full row, so the caller gets a
+# loaded object without the extra SELECT a post-commit refresh() costs.
 async def create_user(db: AsyncSession, user_in: schemas.UserCreate) -> models.User:
-    db_user = models.User(**user_in.model_dump())
-    db.add(db_user)
-    await db.commit()
-    await db.refresh(db_user)
+    db_user = await db.scalar(
+        insert(models.User).values(**user_in.model_dump()).returning(models.User)
+    )
     return db_user
 
 async def get_user(db: AsyncSession, user_id: int) -> models.User | None:
     result = await db.execute(select(models.User).where(models.User.id == user_id))
     return result.scalar_one_or_none()
 
+async def get_user_by_email(db: AsyncSession, email: str) -> models.User | None:
+    result = await db.execute(select(models.User).where(models.User.email == email))
+    return result.scalar_one_or_none()
+
 # ── Sessions ─────────────────────────────────────
 async def create_session(db: AsyncSession, sess_in: schemas.SessionCreate) -> models.Session:
-    db_sess = models.Session(**sess_in.model_dump())
-    db.add(db_sess)
-    await db.commit()
-    await db.refresh(db_sess)
+    db_sess = await db.scalar(
+        insert(models.Session).values(**sess_in.model_dump()).returning(models.Session)
+    )
+    _session_created(db, {
+        c.key: getattr(db_sess, "seats_taken" if c.key == "current_bookings" else c.key)
+        for c in SESSION_READ_COLUMNS
+    })
     return db_sess
 
 async def get_session(db: AsyncSession, session_id: int) -> models.Session | None:
     result = await db.execute(select(models.Session).where(models.Session.id == session_id))
     return result.scalar_one_or_none()
 
-# for availability overlap
+# Read paths below select plain columns (Core rows: compact tuples with
+# attribute access) instead of ORM entities, so nothing is tracked in the
+# identity map or built only to be serialised and thrown away.
+
+# SessionRead's fields, in order
+SESSION_READ_COLUMNS = (
+    models.Session.id,
+    models.Session.tutor_id,
+    models.Session.session_type,
+    models.Session.title,
+    models.Session.day_of_week,
+    models.Session.start_time,
+    models.Session.end_time,
+    models.Session.price_per_seat,
+    models.Session.max_participants,
+    models.Session.zoom_link,
+    models.Session.discord_channel_id,
+    models.Session.discord_invite_link,
+    models.Session.created_at,
+    models.Session.seats_taken.label("current_bookings"),
+)
+
+# keyset-paginated listing, ordered by (start_time, id)
+async def list_sessions_page(
+    db: AsyncSession,
+    *,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    tutor_id: int | None = None,
+    session_type: models.SessionType | None = None,
+    after: tuple[datetime, int] | None = None,
+    limit: int = 100,
+) -> list[Row]:
+    stmt = select(*SESSION_READ_COLUMNS)
+    if tutor_id is not None:
+        stmt = stmt.where(models.Session.tutor_id == tutor_id)
+    if session_type is not None:
+        stmt = stmt.where(models.Session.session_type == session_type)
+    if end is not None:
+        stmt = stmt.where(models.Session.start_time < end)
+    if start is not None:
+        stmt = stmt.where(models.Session.end_time > start)
+    if after is not None:
+        stmt = stmt.where(
+            tuple_(models.Session.start_time, models.Session.id) > tuple_(*after)
+        )
+    stmt = stmt.order_by(models.Session.start_time, models.Session.id).limit(limit)
+    result = await db.execute(stmt)
+    return result.all()
+
+def _overlapping(start: datetime, end: datetime, tutor_id: int | None):
+    conditions = [
+        models.Session.start_time < end,
+        models.Session.end_time   > start,
+    ]
+    # leading tutor_id lets Postgres range-scan ix_sessions_tutor_id_start_time_end_time
+    if tutor_id is not None:
+        conditions.insert(0, models.Session.tutor_id == tutor_id)
+    return and_(*conditions)
+
 async def list_sessions_between(
-    db: AsyncSession, start: datetime, end: datetime
+    db: AsyncSession, start: datetime, end: datetime, tutor_id: int | None = None
 ) -> list[models.Session]:
     result = await db.execute(
-        select(models.Session).where(
-            and_(
-                models.Session.start_time < end,
-                models.Session.end_time   > start,
-            )
-        )
+        select(models.Session)
+        .where(_overlapping(start, end, tutor_id))
+        .order_by(models.Session.start_time)
     )
     return result.scalars().all()
 
+# for availability overlap: just the (start_time, end_time) pairs
+async def list_busy_intervals(
+    db: AsyncSession, start: datetime, end: datetime, tutor_id: int | None = None
+) -> list[Row]:
+    result = await db.execute(
+        select(models.Session.start_time, models.Session.end_time)
+        .where(_overlapping(start, end, tutor_id))
+        .order_by(models.Session.start_time)
+    )
+    return result.all()
+
 # ── Bookings ────────────────────────────────────
 async def create_booking(db: AsyncSession, book_in: schemas.BookingCreate) -> models.Booking:
-    db_book = models.Booking(**book_in.model_dump())
-    db.add(db_book)
-    await db.commit()
-    await db.refresh(db_book)
+    db_book = await db.scalar(
+        insert(models.Booking).values(**book_in.model_dump()).returning(models.Booking)
+    )
     return db_book
 
 async def get_booking(db: AsyncSession, booking_id: int) -> models.Booking | None:
@@ -62,17 +166,106 @@ async def create_session_signup(
     invite_code: str,
     is_paid: bool = False,
 ) -> models.SessionSignup:
-    db_signup = models.SessionSignup(
-        student_id=signup_in.student_id,
-        session_id=signup_in.session_id,
-        invite_code=invite_code,
-        is_paid=is_paid,
-    )
-    db.add(db_signup)
-    await db.commit()
-    await db.refresh(db_signup)
+    db_signup = await db.scalar(
+        insert(models.SessionSignup)
+        .values(
+            student_id=signup_in.student_id,
+            session_id=signup_in.session_id,
+            invite_code=invite_code,
+            is_paid=is_paid,
+        )
+        .returning(models.SessionSignup)
+    )
+    # bump the seat counter in the same transaction as the insert
+    seats_taken = await db.scalar(
+        update(models.Session)
+        .where(models.Session.id == signup_in.session_id)
+        .values(seats_taken=models.Session.seats_taken + 1)
+        .returning(models.Session.seats_taken)
+        .execution_options(synchronize_session=False)
+    )
+    _seats_changed(db, signup_in.session_id, seats_taken)
     return db_signup
 
+async def reserve_seat(
+    db: AsyncSession,
+    signup_in: schemas.SessionSignupCreate,
+    invite_code: str,
+    *,
+    is_paid: bool = False,
+    stripe_session_id: str | None = None,
+    stripe_checkout_url: str | None = None,
+) -> models.SessionSignup | None:
+    """
+    Atomically take a seat and create the signup, or return None when the
+    session is full (or missing). Signups waiting on a Stripe checkout
+    (stripe_session_id set, not yet paid) hold their seat for
+    SEAT_HOLD_TTL_SECONDS before the hold reaper releases it; free and paid
+    signups keep theirs.
+
+    The conditional UPDATE row-locks the session, so concurrent reservations
+    for the last seat serialise on it and only one sees seats_taken below
+    max_participants. On Postgres the UPDATE and INSERT run as a single
+    statement of data-modifying CTEs, i.e. one round trip, which also
+    returns the session's new seats_taken for the live event.
+    """
+    seat = (
+        update(models.Session)
+        .where(
+            models.Session.id == signup_in.session_id,
+            models.Session.seats_taken < models.Session.max_participants,
+        )
+        .values(seats_taken=models.Session.seats_taken + 1)
+        .returning(models.Session.id, models.Session.seats_taken)
+    )
+    now = datetime.now(timezone.utc)
+    hold_expires_at = None
+    if not is_paid and stripe_session_id is not None:
+        hold_expires_at = now + timedelta(seconds=settings.SEAT_HOLD_TTL_SECONDS)
+    columns = [
+        "student_id", "session_id", "invite_code", "is_paid",
+        "stripe_session_id", "stripe_checkout_url", "hold_expires_at", "created_at",
+    ]
+    values = [
+        literal(signup_in.student_id),
+        literal(invite_code),
+        literal(is_paid),
+        literal(stripe_session_id, models.SessionSignup.stripe_session_id.type),
+        literal(stripe_checkout_url, models.SessionSignup.stripe_checkout_url.type),
+        literal(hold_expires_at, models.SessionSignup.hold_expires_at.type),
+        literal(now, models.SessionSignup.created_at.type),
+    ]
+
+    if db.bind.dialect.name == "postgresql":
+        seat_cte = seat.cte("seat")
+        new_signup = (
+            insert(models.SessionSignup)
+            .from_select(columns, select(values[0], seat_cte.c.id, *values[1:]))
+            .returning(*models.SessionSignup.__table__.c)
+            .cte("new_signup")
+        )
+        signup_row = aliased(models.SessionSignup, new_signup)
+        row = (await db.execute(
+            select(signup_row, seat_cte.c.seats_taken)
+            .where(signup_row.session_id == seat_cte.c.id)
+        )).one_or_none()
+        if row is None:
+            return None
+        signup, seats_taken = row
+    else:
+        # no data-modifying CTEs elsewhere; same transaction, two statements
+        taken = (await db.execute(seat.execution_options(synchronize_session=False))).one_or_none()
+        if taken is None:
+            return None
+        signup = await db.scalar(
+            insert(models.SessionSignup)
+            .from_select(columns, select(values[0], literal(taken.id), *values[1:]))
+            .returning(models.SessionSignup)
+        )
+        seats_taken = taken.seats_taken
+    _seats_changed(db, signup.session_id, seats_taken)
+    return signup
+
 async def count_session_signups(db: AsyncSession, session_id: int) -> int:
     result = await db.execute(
         select(func.count(models.SessionSignup.id))
@@ -86,15 +279,103 @@ async def get_signup_by_code(db: AsyncSession, code: str) -> models.SessionSignu
     )
     return result.scalar_one_or_none()
 
+async def get_join_details(db: AsyncSession, code: str) -> Row | None:
+    """Everything GET /class/join needs for an invite code, in one query."""
+    result = await db.execute(
+        select(
+            models.SessionSignup.is_paid,
+            models.Session.id.label("session_id"),
+            models.Session.zoom_link,
+            func.coalesce(
+                models.SessionSignup.discord_invite_link,
+                models.Session.discord_invite_link,
+            ).label("discord_invite_link"),
+            models.Session.price_per_seat,
+        )
+        .join(models.Session, models.Session.id == models.SessionSignup.session_id)
+        .where(models.SessionSignup.invite_code == code)
+    )
+    return result.one_or_none()
+
 async def mark_signup_paid(db: AsyncSession, signup_id: int):
     await db.execute(
         update(models.SessionSignup)
         .where(models.SessionSignup.id == signup_id)
-        .values(is_paid=True)
+        .values(is_paid=True, hold_expires_at=None)
+    )
+
+async def release_expired_holds(
+    db: AsyncSession, now: datetime | None = None, batch_size: int = 500
+) -> int:
+    """
+    Delete up to batch_size unpaid signups whose hold has lapsed and give
+    their seats back, in one DELETE and one UPDATE. Returns holds released.
+    """
+    now = now or datetime.now(timezone.utc)
+    expired = (
+        select(models.SessionSignup.id)
+        .where(
+            ~models.SessionSignup.is_paid,
+            # only checkouts hold; also lets the partial hold index serve this
+            models.SessionSignup.stripe_session_id.is_not(None),
+            models.SessionSignup.hold_expires_at < now,
+        )
+        .order_by(models.SessionSignup.hold_expires_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
     )
-    await db.commit()
+    result = await db.execute(
+        delete(models.SessionSignup)
+        .where(models.SessionSignup.id.in_(expired))
+        .returning(models.SessionSignup.session_id)
+        .execution_options(synchronize_session=False)
+    )
+    released = Counter(result.scalars().all())
+    if released:
+        counts = await db.execute(
+            update(models.Session)
+            .where(models.Session.id.in_(released))
+            .values(
+                seats_taken=models.Session.seats_taken
+                - case(released, value=models.Session.id, else_=0)
+            )
+            .returning(models.Session.id, models.Session.seats_taken)
+            .execution_options(synchronize_session=False)
+        )
+        for session_id, seats_taken in counts:
+            _seats_changed(db, session_id, seats_taken)
+    return released.total()
+
+async def mark_signups_paid_by_codes(db: AsyncSession, codes: list[str]) -> set[str]:
+    """
+    Mark every signup with one of the invite codes paid in a single UPDATE
+    and return the codes that matched; a missing code means its hold lapsed
+    and the reaper already deleted the signup. The webhook worker commits
+    once per batch.
+    """
+    if not codes:
+        return set()
+    if db.bind.dialect.name == "postgresql":
+        # one array parameter: the statement text (and its plan) is the same for any batch size
+        matches = models.SessionSignup.invite_code == any_(
+            bindparam("codes", list(codes), type_=ARRAY(String))
+        )
+    else:
+        matches = models.SessionSignup.invite_code.in_(codes)
+    result = await db.execute(
+        update(models.SessionSignup)
+        .where(matches)
+        .values(is_paid=True, hold_expires_at=None)
+        .returning(models.SessionSignup.invite_code)
+        .execution_options(synchronize_session=False)
+    )
+    return set(result.scalars().all())
 
 # ── Stripe helpers for ad-hoc checkout ──────────
+class SlotTaken(Exception):
+    """The tutor already has a session overlapping a paid ad-hoc slot."""
+
 async def get_signup_by_stripe_session_id(db: AsyncSession, cs_id: str):
     res = await db.execute(
         select(models.SessionSignup).where(models.SessionSignup.stripe_session_id == cs_id)
@@ -112,29 +393,212 @@ async def create_one_off_session_and_signup(
     stripe_session_id: str,
     zoom_link: str | None = None,
     discord_invite_link: str | None = None,
-) -> models.SessionSignup:
-    sess = models.Session(
-        tutor_id=tutor_id,
-        title="1:1 Tutoring",
-        session_type=models.SessionType.one_on_one,
-        start_time=start_dt,
-        end_time=end_dt,
-        price_per_seat=amount_cents,
-        max_participants=1,
-        zoom_link=zoom_link,
-        discord_invite_link=discord_invite_link,
-    )
-    db.add(sess)
-    await db.flush()
-
-    signup = models.SessionSignup(
-        student_id=student_id,
-        session_id=sess.id,
-        invite_code=uuid4().hex,
-        is_paid=True,
-        stripe_session_id=stripe_session_id,
-    )
-    db.add(signup)
-    await db.commit()
-    await db.refresh(signup)
-    return signup
+) -> tuple[models.SessionSignup, bool]:
+    """
+    Fulfil a paid ad-hoc checkout: one 1:1 session plus its paid signup.
+
+    Both rows go in under a savepoint; on Postgres as one data-modifying CTE
+    (a single round trip), elsewhere as two INSERT ... RETURNING statements.
+    The unique index on stripe_session_id (or, for a racing delivery, the
+    tutor overlap constraint) rejects a second fulfilment of the same
+    checkout; only then is the existing signup looked up. An overlap with
+    some other session raises SlotTaken: retrying can't fix that.
+    Returns (signup, created).
+    """
+    new_session = (
+        insert(models.Session)
+        .values(
+            tutor_id=tutor_id,
+            title="1:1 Tutoring",
+            session_type=models.SessionType.one_on_one,
+            start_time=start_dt,
+            end_time=end_dt,
+            price_per_seat=amount_cents,
+            max_participants=1,
+            seats_taken=1,
+            zoom_link=zoom_link,
+            discord_invite_link=discord_invite_link,
+        )
+        .returning(models.Session.id)
+    )
+    columns = [
+        "student_id", "session_id", "invite_code", "is_paid",
+        "stripe_session_id", "created_at",
+    ]
+    values = [
+        literal(student_id),
+        literal(uuid4().hex),
+        literal(True),
+        literal(stripe_session_id, models.SessionSignup.stripe_session_id.type),
+        literal(datetime.now(timezone.utc), models.SessionSignup.created_at.type),
+    ]
+    try:
+        async with db.begin_nested():
+            if db.bind.dialect.name == "postgresql":
+                session_cte = new_session.cte("new_session")
+                source = select(values[0], session_cte.c.id, *values[1:])
+            else:
+                session_id = await db.scalar(new_session)
+                source = select(values[0], literal(session_id), *values[1:])
+            signup = await db.scalar(
+                insert(models.SessionSignup)
+                .from_select(columns, source)
+                .returning(models.SessionSignup)
+            )
+    except IntegrityError as exc:
+        existing = await get_signup_by_stripe_session_id(db, stripe_session_id)
+        if existing is not None:
+            return existing, False
+        # 23P01 exclusion_violation: ex_sessions_tutor_id_no_overlap
+        if getattr(exc.orig, "sqlstate", None) == "23P01":
+            raise SlotTaken(
+                f"tutor {tutor_id} is already booked between {start_dt.isoformat()} and {end_dt.isoformat()}"
+            ) from exc
+        raise
+    _session_created(db, {
+        "id": signup.session_id,
+        "tutor_id": tutor_id,
+        "session_type": models.SessionType.one_on_one,
+        "title": "1:1 Tutoring",
+        "day_of_week": None,
+        "start_time": start_dt,
+        "end_time": end_dt,
+        "price_per_seat": amount_cents,
+        "max_participants": 1,
+        "zoom_link": zoom_link,
+        "discord_channel_id": None,
+        "discord_invite_link": discord_invite_link,
+        "created_at": signup.created_at,
+        "current_bookings": 1,
+    })
+    return signup, True
+
+# ── Seat counter maintenance ────────────────────
+def _actual_seats():
+    return (
+        select(func.count(models.SessionSignup.id))
+        .where(models.SessionSignup.session_id == models.Session.id)
+        .scalar_subquery()
+    )
+
+async def find_seat_count_drift(db: AsyncSession) -> list[tuple[int, int, int]]:
+    """(session_id, seats_taken, actual signups) for every session that disagrees."""
+    actual = _actual_seats()
+    result = await db.execute(
+        select(models.Session.id, models.Session.seats_taken, actual)
+        .where(models.Session.seats_taken != actual)
+        .order_by(models.Session.id)
+    )
+    return [tuple(row) for row in result.all()]
+
+async def repair_seat_counts(db: AsyncSession) -> int:
+    """Recompute seats_taken from session_signups; returns rows corrected."""
+    actual = _actual_seats()
+    result = await db.execute(
+        update(models.Session)
+        .where(models.Session.seats_taken != actual)
+        .values(seats_taken=actual)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount:
+        invalidate_catalog(db)
+        publish_after_commit(db, RESYNC)
+    return result.rowcount
+
+# ── Stripe webhook inbox ────────────────────────
+async def enqueue_webhook_event(
+    db: AsyncSession, event_id: str, event_type: str, payload: dict
+) -> bool:
+    """
+    Store an event unless its Stripe id is already in the inbox.
+
+    Returns False for a redelivery. Uses INSERT ... ON CONFLICT DO NOTHING so
+    a duplicate costs one statement and never raises or aborts the transaction;
+    other dialects insert under a savepoint and treat the unique violation as
+    already seen.
+    """
+    dialect = db.bind.dialect.name
+    if dialect == "postgresql":
+        stmt = pg_insert(models.StripeWebhookEvent)
+    elif dialect == "sqlite":
+        stmt = sqlite_insert(models.StripeWebhookEvent)
+    else:
+        try:
+            async with db.begin_nested():
+                await db.execute(
+                    insert(models.StripeWebhookEvent).values(
+                        event_id=event_id,
+                        event_type=event_type,
+                        payload=payload,
+                    )
+                )
+        except IntegrityError:
+            return False
+        return True
+    result = await db.execute(
+        stmt.values(
+            event_id=event_id,
+            event_type=event_type,
+            payload=payload,
+        )
+        .on_conflict_do_nothing(index_elements=["event_id"])
+        .returning(models.StripeWebhookEvent.id)
+    )
+    return result.scalar_one_or_none() is not None
+
+async def claim_webhook_events(
+    db: AsyncSession, batch_size: int, max_attempts: int
+) -> list[models.StripeWebhookEvent]:
+    """Oldest unprocessed events, row-locked so parallel workers skip each other's batches."""
+    result = await db.execute(
+        select(models.StripeWebhookEvent)
+        .where(
+            models.StripeWebhookEvent.processed_at.is_(None),
+            models.StripeWebhookEvent.attempts < max_attempts,
+        )
+        .order_by(models.StripeWebhookEvent.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    return result.scalars().all()
+
+async def finish_webhook_events(
+    db: AsyncSession,
+    done_ids: list[int],
+    failed: dict[int, str],
+    dead: dict[int, str] | None = None,
+) -> None:
+    """
+    Stamp processed events and record failures. Failed events are retried;
+    dead ones can never succeed (the seat is gone and the payment needs a
+    refund, or WEBHOOK_MAX_ATTEMPTS ran out), so they are stamped processed
+    with their reason in last_error.
+    """
+    for event_id, reason in (dead or {}).items():
+        await db.execute(
+            update(models.StripeWebhookEvent)
+            .where(models.StripeWebhookEvent.id == event_id)
+            .values(
+                processed_at=datetime.now(timezone.utc),
+                attempts=models.StripeWebhookEvent.attempts + 1,
+                last_error=reason[:500],
+            )
+            .execution_options(synchronize_session=False)
+        )
+    if done_ids:
+        await db.execute(
+            update(models.StripeWebhookEvent)
+            .where(models.StripeWebhookEvent.id.in_(done_ids))
+            .values(processed_at=datetime.now(timezone.utc))
+            .execution_options(synchronize_session=False)
+        )
+    for event_id, error in failed.items():
+        await db.execute(
+            update(models.StripeWebhookEvent)
+            .where(models.StripeWebhookEvent.id == event_id)
+            .values(
+                attempts=models.StripeWebhookEvent.attempts + 1,
+                last_error=error[:500],
+            )
+            .execution_options(synchronize_session=False)
+        )
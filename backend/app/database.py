@@ -1,19 +1,100 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+import asyncio
+import time
+from collections.abc import Awaitable, Callable, Hashable
+from typing import TypeVar
+
+from fastapi import Depends, Request, Response
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
+from .cache import SingleFlight
 from .config import settings
 
+T = TypeVar("T")
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """QueuePool that records how long checkouts wait for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _do_get(self):
+        began = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeout:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - began
+            self.checkouts += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+    def stats(self) -> dict:
+        return {
+            "pool_size": self.size(),
+            "checked_out": self.checkedout(),
+            "idle": self.checkedin(),
+            "overflow": max(0, self.overflow()),
+            "max_overflow": self._max_overflow,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_ms_avg": round(1000 * self.wait_seconds_total / self.checkouts, 3)
+            if self.checkouts else 0.0,
+            "wait_ms_max": round(1000 * self.wait_seconds_max, 3),
+        }
+
+def _create_engine(url: str) -> AsyncEngine:
+    return create_async_engine(
+        url,
+        echo=False,
+        future=True,
+        poolclass=InstrumentedPool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        # asyncpg prepared statements, cached per connection (0 behind pgbouncer)
+        connect_args={"prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE},
+    )
+
 # async engine for Postgres
-engine = create_async_engine(
-    str(settings.DATABASE_URL),
-    echo=False,
-    future=True,
+engine = _create_engine(str(settings.DATABASE_URL))
+
+# optional streaming replica for read-only endpoints; None routes reads to the primary
+read_engine = (
+    _create_engine(str(settings.READ_DATABASE_URL)) if settings.READ_DATABASE_URL else None
 )
 
-# session factory
+async def prewarm_pool(db_engine: AsyncEngine, connections: int) -> None:
+    """Open `connections` pooled connections up front, so the first requests don't pay for the handshakes."""
+    connections = min(connections, db_engine.pool.size())
+    opened = await asyncio.gather(*(db_engine.connect() for _ in range(connections)))
+    for conn in opened:
+        await conn.close()
+
+# session factories
 AsyncSessionLocal = sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False
 )
+ReadSessionLocal = (
+    sessionmaker(read_engine, class_=AsyncSession, expire_on_commit=False)
+    if read_engine is not None else None
+)
+
+# set on writes; while valid, that client's reads go to the primary so it
+# never reads from a replica that has not replayed its own write yet
+PRIMARY_STICKY_COOKIE = "read_primary_until"
+# Session.info flag: this request must see the client's own recent writes
+READ_YOUR_WRITES = "read_your_writes"
 
 Base = declarative_base()
 
@@ -21,3 +102,84 @@ async def get_db() -> AsyncSession:
     async with AsyncSessionLocal() as session:
         yield session
 
+async def get_uow(
+    response: Response, db: AsyncSession = Depends(get_db)
+) -> AsyncSession:
+    """
+    Unit of work for write endpoints: the whole request is one transaction,
+    committed once after the handler returns and rolled back if it raises
+    (HTTPException included). Shares the request's get_db session, so
+    get_current_user and friends see the same transaction.
+
+    Also pins the client's reads to the primary for READ_YOUR_WRITES_SECONDS.
+    The cookie is set up front because FastAPI has already built the
+    response by the time the code after `yield` runs.
+    """
+    if ReadSessionLocal is not None:
+        window = settings.READ_YOUR_WRITES_SECONDS
+        response.set_cookie(
+            PRIMARY_STICKY_COOKIE,
+            str(int(time.time()) + window),
+            max_age=window,
+            httponly=True,
+            samesite="lax",
+        )
+    try:
+        yield db
+    except Exception:
+        await db.rollback()
+        raise
+    await db.commit()
+
+def _pinned_to_primary(request: Request) -> bool:
+    try:
+        return float(request.cookies.get(PRIMARY_STICKY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+async def get_read_db(
+    request: Request, db: AsyncSession = Depends(get_db)
+) -> AsyncSession:
+    """
+    Session for read-only endpoints: the replica when one is configured,
+    else (or right after this client wrote something) the primary session.
+    """
+    if _pinned_to_primary(request):
+        db.info[READ_YOUR_WRITES] = True
+        yield db
+        return
+    if ReadSessionLocal is None:
+        yield db
+        return
+    async with ReadSessionLocal() as session:
+        yield session
+
+# identical reads in flight at the same moment share one query (coalesce_read)
+read_coalescer = SingleFlight()
+
+async def coalesce_read(
+    db: AsyncSession,
+    key: tuple[Hashable, ...],
+    query: Callable[[AsyncSession], Awaitable[T]],
+) -> T:
+    """
+    Run query once for every concurrent request with the same key against
+    the same database (db's engine), and give each the result. key[0]
+    names the endpoint in the coalescing metrics.
+
+    The shared query runs in its own short-lived session so it outlives
+    whichever request started it; the requests' own sessions never check
+    out a connection. Results are shared between requests: read-only.
+
+    A request pinned to the primary by its own recent write runs alone: a
+    query already in flight may have started before that write committed.
+    """
+    if not settings.READ_COALESCING or db.info.get(READ_YOUR_WRITES):
+        return await query(db)
+    bind = db.bind
+
+    async def run() -> T:
+        async with AsyncSession(bind, expire_on_commit=False) as session:
+            return await query(session)
+
+    return await read_coalescer.do((id(bind), key), run, label=str(key[0]))
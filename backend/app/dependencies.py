@@ -1,22 +1,55 @@
-from fastapi import Depends, HTTPException, status
-from pydantic_settings import BaseSettings
+from fastapi import Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-
+from .auth import AuthError, CurrentUser, KeysUnavailable, verify_token
+from .cache import TTLCache
+from .config import settings
 from .database import get_db
-from .crud import get_user
+from .crud import get_user_by_email
+
+# token claim (email) → user, so steady-state auth needs no database query
+user_cache = TTLCache(settings.AUTH_USER_CACHE_SIZE, settings.AUTH_USER_CACHE_SECONDS)
+
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
 
-# --- Authentication stub ---
-async def get_current_user(db: AsyncSession = Depends(get_db)):
+def _bearer_token(request: Request) -> str | None:
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        return token.strip()
+    # the frontend sends credentials (cookies) with every API call
+    return request.cookies.get(settings.AUTH_COOKIE_NAME)
+
+async def get_current_user(
+    request: Request, db: AsyncSession = Depends(get_db)
+) -> CurrentUser:
     """
-    Placeholder dependency that retrieves a user.
-    TODO: Replace with real authentication logic.
+    Verify the bearer token locally and map its email claim to a user.
+    Only a user-cache miss touches the database.
     """
-    # For now, assume user_id=1
-    user = await get_user(db, 1)
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials"
+    token = _bearer_token(request)
+    if not token:
+        raise _unauthorized("Not authenticated")
+    try:
+        claims = await verify_token(token)
+    except AuthError as exc:
+        raise _unauthorized(str(exc))
+    except KeysUnavailable as exc:
+        # our fault, not the client's: don't make it throw away a good token
+        raise HTTPException(status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc))
+
+    email = claims[settings.JWT_EMAIL_CLAIM]
+    user = user_cache.get(email)
+    if user is None:
+        db_user = await get_user_by_email(db, email)
+        if not db_user:
+            raise _unauthorized("Unknown user")
+        user = CurrentUser(
+            id=db_user.id, email=db_user.email, name=db_user.name, role=db_user.role
         )
-    return user
\ No newline at end of file
+        user_cache.set(email, user)
+    return user
@@ -0,0 +1,58 @@
+# backend/app/events.py
+"""
+Live booking events for connected clients (GET /events, server-sent events).
+
+Write paths queue events with invalidation.publish_after_commit; once the
+transaction commits they reach this worker's hub directly and every other
+worker's hub over the invalidation bus. The hub fans each event out to one
+bounded queue per connected client. A client that falls behind gets a
+"resync" event in place of what it missed and reloads once.
+
+Event types:
+    seats    {"session_id", "seats_taken"}  the session's new seat count
+    session  {"session": SessionRead}       a session was created (slot booked)
+    resync   {}                             state changed in bulk; reload
+"""
+import asyncio
+from typing import Any
+
+from .config import settings
+
+RESYNC = {"type": "resync"}
+
+class EventHub:
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._subscribers: set[asyncio.Queue] = set()
+        self.broadcasts = 0
+        self.overflows = 0
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+
+    def broadcast(self, event: dict[str, Any]) -> None:
+        self.broadcasts += 1
+        for queue in self._subscribers:
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # don't let a stalled client grow the backlog; swap it for one resync
+                self.overflows += 1
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESYNC)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "subscribers": len(self._subscribers),
+            "queue_size": self.queue_size,
+            "broadcasts": self.broadcasts,
+            "overflows": self.overflows,
+        }
+
+hub = EventHub(settings.EVENT_STREAM_QUEUE_SIZE)
@@ -0,0 +1,248 @@
+# backend/app/invalidation.py
+"""
+Cache invalidation driven by committed writes, across every worker.
+
+Write paths call invalidate_after_commit(db, cache, keys). The keys are
+queued on the ORM session and handled at the outermost commit:
+
+* locally, they are evicted from the cache right after the commit;
+* for caches in the registry, the same keys are published to every other
+  worker as part of the committing transaction, so a rolled-back write is
+  never announced and a committed one always is.
+
+Live booking events (app.events) ride the same bus: publish_after_commit
+queues one, and after the commit it reaches every worker's event hub.
+
+On Postgres the message is a NOTIFY on CACHE_INVALIDATION_CHANNEL, and each
+worker LISTENs on a dedicated asyncpg connection (run_invalidation_listener).
+Whenever that connection is (re)established the registered caches are
+cleared, since anything published while it was down was missed. Elsewhere
+(SQLite test and dev runs) the message is a row in cache_invalidations that
+every worker polls (run_invalidation_poller).
+
+Cache keys must be JSON-able: strings, numbers, or tuples of them.
+"""
+import asyncio
+import logging
+from collections.abc import Hashable, Iterable
+from contextlib import suppress
+from datetime import datetime, timedelta, timezone
+from typing import Any
+from uuid import uuid4
+
+import asyncpg
+import orjson
+from sqlalchemy import delete, event, func, insert, select
+from sqlalchemy.orm import Session
+
+from .cache import LRUCache
+from .config import settings
+from .database import AsyncSessionLocal, engine
+from .events import RESYNC, hub
+from .serialization import dumps
+from . import models
+
+logger = logging.getLogger(__name__)
+
+# tags this process's messages so it can skip its own
+WORKER_ID = uuid4().hex
+
+# Postgres caps a NOTIFY payload at 8000 bytes; past this a whole cache is cleared
+MAX_PAYLOAD_BYTES = 7000
+
+_PENDING = "pending_cache_invalidations"
+_EVENTS = "pending_booking_events"
+
+registry: dict[str, LRUCache] = {}
+stats = {"published": 0, "received": 0, "applied": 0, "connects": 0}
+
+def register(name: str, cache: LRUCache) -> LRUCache:
+    """Make `cache` invalidated cluster-wide under `name`."""
+    registry[name] = cache
+    return cache
+
+def invalidate_after_commit(db, cache: LRUCache, keys: Iterable[Hashable]) -> None:
+    """Queue keys on db's session (sync or async) for eviction once it commits."""
+    db.info.setdefault(_PENDING, []).append((cache, list(keys)))
+
+def publish_after_commit(db, booking_event: dict[str, Any]) -> None:
+    """Queue a live event (see app.events) for every worker once db commits."""
+    db.info.setdefault(_EVENTS, []).append(booking_event)
+
+def clear_registered() -> None:
+    for cache in registry.values():
+        cache.invalidate(())
+        cache.clear()
+
+def _dumps(message: dict[str, Any]) -> str:
+    # events carry datetimes and enums; same encoding as the HTTP responses
+    return dumps({"origin": WORKER_ID, **message}).decode()
+
+def _messages(pending: list[tuple[LRUCache, list]], events: list[dict] = ()) -> list[str]:
+    names = {id(cache): name for name, cache in registry.items()}
+    by_cache: dict[str, list] = {}
+    for cache, keys in pending:
+        if id(cache) in names:
+            by_cache.setdefault(names[id(cache)], []).extend(keys)
+    messages = []
+    for name, keys in by_cache.items():
+        payload = _dumps({"cache": name, "keys": list(dict.fromkeys(keys))})
+        if len(payload.encode()) > MAX_PAYLOAD_BYTES:
+            payload = _dumps({"cache": name, "keys": None})
+        messages.append(payload)
+    for booking_event in events:
+        payload = _dumps({"event": booking_event})
+        if len(payload.encode()) > MAX_PAYLOAD_BYTES:
+            payload = _dumps({"event": RESYNC})
+        messages.append(payload)
+    return messages
+
+def apply(payload: str) -> None:
+    """
+    Act on a message from another worker: evict the keys it names (a null
+    key list clears the cache) or pass its event to this worker's hub.
+    """
+    message = orjson.loads(payload)
+    stats["received"] += 1
+    if message["origin"] == WORKER_ID:
+        return      # already handled locally at commit
+    if "event" in message:
+        hub.broadcast(message["event"])
+        stats["applied"] += 1
+        return
+    cache = registry.get(message["cache"])
+    if cache is None:
+        return
+    if message["keys"] is None:
+        cache.invalidate(())
+        cache.clear()
+    else:
+        cache.invalidate(tuple(k) if isinstance(k, list) else k for k in message["keys"])
+    stats["applied"] += 1
+
+def _mode(dialect_name: str) -> str:
+    if settings.CACHE_INVALIDATION_MODE != "auto":
+        return settings.CACHE_INVALIDATION_MODE
+    return "notify" if dialect_name == "postgresql" else "poll"
+
+@event.listens_for(Session, "before_commit")
+def _publish(session: Session) -> None:
+    if session.in_nested_transaction():
+        return
+    messages = _messages(session.info.get(_PENDING, ()), session.info.get(_EVENTS, ()))
+    if not messages:
+        return
+    mode = _mode(session.get_bind().dialect.name)
+    if mode == "notify":
+        for payload in messages:
+            session.execute(select(func.pg_notify(settings.CACHE_INVALIDATION_CHANNEL, payload)))
+    elif mode == "poll":
+        session.execute(
+            insert(models.CacheInvalidation),
+            [{"payload": payload} for payload in messages],
+        )
+    else:
+        return
+    stats["published"] += len(messages)
+
+@event.listens_for(Session, "after_commit")
+def _flush_invalidations(session: Session) -> None:
+    if session.in_nested_transaction():
+        return      # releasing a savepoint; the outer transaction may still roll back
+    for cache, keys in session.info.pop(_PENDING, ()):
+        cache.invalidate(keys)
+    for booking_event in session.info.pop(_EVENTS, ()):
+        hub.broadcast(booking_event)
+
+@event.listens_for(Session, "after_transaction_end")
+def _drop_invalidations(session: Session, transaction) -> None:
+    if transaction.parent is None:
+        # still queued: the transaction ended without committing
+        session.info.pop(_PENDING, None)
+        session.info.pop(_EVENTS, None)
+
+# ── Receiving ───────────────────────────────────
+async def run_invalidation_listener() -> None:
+    """LISTEN for other workers' invalidations until cancelled, reconnecting as needed."""
+    # same server and credentials as the pool, but outside it: LISTEN is per connection
+    _, connect_kwargs = engine.dialect.create_connect_args(engine.url)
+    while True:
+        conn = None
+        try:
+            conn = await asyncpg.connect(**connect_kwargs)
+            lost = asyncio.Event()
+            conn.add_termination_listener(lambda _conn: lost.set())
+            await conn.add_listener(
+                settings.CACHE_INVALIDATION_CHANNEL,
+                lambda _conn, _pid, _channel, payload: apply(payload),
+            )
+            # whatever was published while we weren't listening is gone
+            clear_registered()
+            stats["connects"] += 1
+            while not lost.is_set():
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(
+                        lost.wait(), timeout=settings.CACHE_INVALIDATION_KEEPALIVE_SECONDS
+                    )
+                if not lost.is_set():
+                    # a half-open socket only shows up when we use it, and may never answer
+                    try:
+                        await asyncio.wait_for(
+                            conn.execute("SELECT 1"),
+                            timeout=settings.CACHE_INVALIDATION_KEEPALIVE_SECONDS,
+                        )
+                    except asyncio.TimeoutError:
+                        conn.terminate()
+                        break
+            logger.warning("Cache invalidation listener lost its connection")
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Cache invalidation listener failed")
+        finally:
+            if conn is not None:
+                with suppress(Exception):
+                    await conn.close()
+        # local caches can't be trusted while we can't hear other workers
+        clear_registered()
+        await asyncio.sleep(settings.CACHE_INVALIDATION_RETRY_SECONDS)
+
+async def poll_invalidations(db, after_id: int) -> int:
+    """Apply messages newer than after_id; returns the last id seen."""
+    result = await db.execute(
+        select(models.CacheInvalidation.id, models.CacheInvalidation.payload)
+        .where(models.CacheInvalidation.id > after_id)
+        .order_by(models.CacheInvalidation.id)
+    )
+    for row_id, payload in result.all():
+        apply(payload)
+        after_id = row_id
+    return after_id
+
+async def run_invalidation_poller() -> None:
+    """Fallback for databases without LISTEN/NOTIFY: poll cache_invalidations."""
+    retention = timedelta(seconds=settings.CACHE_INVALIDATION_RETENTION_SECONDS)
+    async with AsyncSessionLocal() as db:
+        last_id = await db.scalar(select(func.coalesce(func.max(models.CacheInvalidation.id), 0)))
+        await db.commit()
+    while True:
+        try:
+            async with AsyncSessionLocal() as db:
+                last_id = await poll_invalidations(db, last_id)
+                await db.execute(
+                    delete(models.CacheInvalidation)
+                    .where(models.CacheInvalidation.created_at < datetime.now(timezone.utc) - retention)
+                )
+                await db.commit()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Cache invalidation poll failed")
+        await asyncio.sleep(settings.CACHE_INVALIDATION_POLL_SECONDS)
+
+async def run_invalidation_bus() -> None:
+    mode = _mode(engine.dialect.name)
+    if mode == "notify":
+        await run_invalidation_listener()
+    elif mode == "poll":
+        await run_invalidation_poller()
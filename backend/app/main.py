@@ -1,24 +1,76 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from .routers import users, sessions, bookings, classes, book_session, class_bookings, stripe_webhook, checkout, availability
+from fastapi.responses import JSONResponse
+from .routers import users, sessions, bookings, classes, book_session, class_bookings, stripe_webhook, checkout, availability, metrics, events
 import stripe
 from .config import settings
+from .database import engine, read_engine, prewarm_pool
+from .invalidation import run_invalidation_bus
+from .reaper import run_hold_reaper
+from .serialization import AppJSONResponse
+from .webhook_worker import run_webhook_worker
+from .stripe_gateway import gateway, StripeUnavailable
 
 stripe.api_key = settings.STRIPE_API_KEY
 
-app = FastAPI(title="Tutoring Platform API", version ="1.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await prewarm_pool(engine, settings.DB_POOL_PREWARM)
+    if read_engine is not None:
+        await prewarm_pool(read_engine, settings.DB_POOL_PREWARM)
+    # release seats held by abandoned checkouts, and drain the Stripe webhook inbox
+    tasks = [asyncio.create_task(run_hold_reaper())]
+    tasks += [
+        asyncio.create_task(run_webhook_worker())
+        for _ in range(settings.WEBHOOK_WORKERS)
+    ]
+    # hear other workers' cache invalidations
+    tasks.append(asyncio.create_task(run_invalidation_bus()))
+    try:
+        yield
+    finally:
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            with suppress(asyncio.CancelledError):
+                await task
+        gateway.close()
+        await engine.dispose()
+        if read_engine is not None:
+            await read_engine.dispose()
+
+app = FastAPI(
+    title="Tutoring Platform API",
+    version ="1.0",
+    lifespan=lifespan,
+    # orjson for every response body; big listings also skip re-validation (app.serialization)
+    default_response_class=AppJSONResponse,
+)
 
 origins = [
     "http://localhost:3000",
     "http://127.0.0.1:3000",
 ]
 
+@app.exception_handler(StripeUnavailable)
+async def stripe_unavailable_handler(request: Request, exc: StripeUnavailable):
+    headers = {"Retry-After": str(max(1, round(exc.retry_after)))} if exc.retry_after else None
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Payments are temporarily unavailable, please retry shortly"},
+        headers=headers,
+    )
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # @app.get("/", tags=["root"])
@@ -33,4 +85,6 @@ app.include_router(book_session.router)
 app.include_router(class_bookings.router)
 app.include_router(stripe_webhook.router)
 app.include_router(availability.router)
-app.include_router(checkout.router)
\ No newline at end of file
+app.include_router(checkout.router)
+app.include_router(metrics.router)
+app.include_router(events.router)
\ No newline at end of file
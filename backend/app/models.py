@@ -1,7 +1,8 @@
 from sqlalchemy import (
     Column, Integer, String, DateTime,
-    Enum, ForeignKey, Boolean
+    Enum, ForeignKey, Boolean, Index, JSON, func, text
 )
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 import enum
@@ -49,6 +50,8 @@ class Session(Base):
 
     price_per_seat       = Column(Integer, nullable=False, default=0)  # cents
     max_participants     = Column(Integer, nullable=False, default=1)
+    # denormalised count of signups, kept in step with every signup write
+    seats_taken          = Column(Integer, nullable=False, default=0, server_default="0")
 
     zoom_link            = Column(String, nullable=True)
     discord_channel_id   = Column(String, nullable=True)
@@ -65,12 +68,27 @@ class Session(Base):
     booking = relationship("Booking", back_populates="session", uselist=False)
     signups = relationship("SessionSignup", back_populates="session")
 
+    __table_args__ = (
+        # serves per-tutor overlap lookups (tutor_id = ? AND start_time < ? AND end_time > ?)
+        Index("ix_sessions_tutor_id_start_time_end_time", "tutor_id", "start_time", "end_time"),
+        # keyset pagination for GET /sessions, optionally filtered by type
+        Index("ix_sessions_start_time_id", "start_time", "id"),
+        Index("ix_sessions_session_type_start_time_id", "session_type", "start_time", "id"),
+        # a tutor can never hold two overlapping sessions (Postgres only, needs btree_gist)
+        ExcludeConstraint(
+            (tutor_id, "="),
+            (func.tstzrange(start_time, end_time), "&&"),
+            name="ex_sessions_tutor_id_no_overlap",
+            using="gist",
+        ).ddl_if(dialect="postgresql"),
+    )
+
 class Booking(Base):
     __tablename__ = "bookings"
 
     id         = Column(Integer, primary_key=True, index=True)
-    user_id    = Column(Integer, ForeignKey("users.id"), nullable=False)
-    session_id = Column(Integer, ForeignKey("sessions.id"), nullable=False)
+    user_id    = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    session_id = Column(Integer, ForeignKey("sessions.id"), nullable=False, index=True)
     call_type  = Column(String, nullable=False)
     created_at = Column(
         DateTime(timezone=True),
@@ -85,8 +103,8 @@ class SessionSignup(Base):
     __tablename__ = "session_signups"
 
     id                  = Column(Integer, primary_key=True, index=True)
-    student_id          = Column(Integer, ForeignKey("users.id"), nullable=False)
-    session_id          = Column(Integer, ForeignKey("sessions.id"), nullable=False)
+    student_id          = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    session_id          = Column(Integer, ForeignKey("sessions.id"), nullable=False, index=True)
 
     invite_code         = Column(String, unique=True, nullable=False, index=True)
     is_paid             = Column(Boolean, default=False, nullable=False)
@@ -94,6 +112,8 @@ class SessionSignup(Base):
     discord_invite_link = Column(String, nullable=True)
     stripe_session_id   = Column(String, nullable=True)
     stripe_checkout_url = Column(String, nullable=True)
+    # signups awaiting a checkout release their seat once this passes (NULL once paid, or if free)
+    hold_expires_at     = Column(DateTime(timezone=True), nullable=True)
     
 
     created_at = Column(
@@ -104,3 +124,60 @@ class SessionSignup(Base):
 
     student = relationship("User", back_populates="session_signups")
     session = relationship("Session", back_populates="signups")
+
+    __table_args__ = (
+        # partial index keeps the hold reaper's scan proportional to open holds
+        Index(
+            "ix_session_signups_unpaid_hold_expires_at",
+            "hold_expires_at",
+            postgresql_where=text("NOT is_paid AND stripe_session_id IS NOT NULL"),
+            # SQLite renders ~is_paid as "is_paid = 0"; the predicate must match it verbatim
+            sqlite_where=text("is_paid = 0 AND stripe_session_id IS NOT NULL"),
+        ),
+        # one signup per Checkout session; makes webhook fulfilment idempotent
+        Index(
+            "uq_session_signups_stripe_session_id",
+            "stripe_session_id",
+            unique=True,
+        ),
+    )
+
+class StripeWebhookEvent(Base):
+    """Inbox of verified Stripe events, drained asynchronously by app.webhook_worker."""
+    __tablename__ = "stripe_webhook_events"
+
+    id           = Column(Integer, primary_key=True, index=True)
+    event_id     = Column(String, unique=True, nullable=False)
+    event_type   = Column(String, nullable=False)
+    payload      = Column(JSON, nullable=False)
+    attempts     = Column(Integer, nullable=False, default=0, server_default="0")
+    last_error   = Column(String, nullable=True)
+    received_at  = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False
+    )
+    processed_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # workers only ever look at the unprocessed tail
+        Index(
+            "ix_stripe_webhook_events_pending",
+            "id",
+            postgresql_where=text("processed_at IS NULL"),
+            sqlite_where=text("processed_at IS NULL"),
+        ),
+    )
+
+class CacheInvalidation(Base):
+    """Invalidation messages for workers polling instead of LISTENing (see app.invalidation)."""
+    __tablename__ = "cache_invalidations"
+
+    id         = Column(Integer, primary_key=True)
+    payload    = Column(String, nullable=False)
+    created_at = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+        index=True,
+    )
@@ -0,0 +1,43 @@
+# backend/app/reaper.py
+"""
+Background task that releases seats held by abandoned (unpaid) signups.
+
+Each pass drains expired holds in batches of HOLD_REAPER_BATCH_SIZE, so a
+pass costs O(expired holds) via the partial hold index, never a scan of all
+signups.
+"""
+import asyncio
+import logging
+
+from .config import settings
+from .database import AsyncSessionLocal
+from . import crud
+
+logger = logging.getLogger(__name__)
+
+async def reap_expired_holds() -> int:
+    """Release every currently expired hold; returns how many were freed."""
+    total = 0
+    async with AsyncSessionLocal() as db:
+        while True:
+            released = await crud.release_expired_holds(
+                db, batch_size=settings.HOLD_REAPER_BATCH_SIZE
+            )
+            # commit per batch so row locks are held only briefly
+            await db.commit()
+            total += released
+            if released < settings.HOLD_REAPER_BATCH_SIZE:
+                return total
+
+async def run_hold_reaper() -> None:
+    """Loop forever (until cancelled), reaping every HOLD_REAPER_INTERVAL_SECONDS."""
+    while True:
+        try:
+            released = await reap_expired_holds()
+            if released:
+                logger.info("Released %d expired seat hold(s)", released)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Seat hold reaper pass failed")
+        await asyncio.sleep(settings.HOLD_REAPER_INTERVAL_SECONDS)
@@ -1,57 +1,83 @@
 # backend/app/routers/availability.py
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from datetime import datetime, timedelta, time
+from datetime import datetime, timedelta
 from typing import List, Dict, Any
-from ..database import get_db
+from ..database import coalesce_read, get_db
+from ..availability import as_utc, busy_cache, busy_key, day_bounds, free_slots, utc_days
+from ..serialization import json_rows, with_etag
+from ..config import settings
 from .. import crud
 
 router = APIRouter(prefix="/availability", tags=["availability"])
 
-WORK_START = time(hour=6)
-WORK_END   = time(hour=22)
-SLOT_MINUTES = 60
 PRICE_PER_HOUR_CENTS = 3000  # $30/hr
 
+async def _busy_intervals(
+    db: AsyncSession, tutor_id: int, start: datetime, end: datetime
+) -> list[tuple[datetime, datetime]]:
+    """The tutor's busy intervals on every UTC day [start, end) touches, cache first."""
+    days = utc_days(start, end)
+    per_day = {day: busy_cache.get(busy_key(tutor_id, day)) for day in days}
+    missing = [day for day in days if per_day[day] is None]
+    if missing:
+        # one query for the whole run of days from the first miss to the last;
+        # primary reads only, so a lagging replica can never refill a stale day
+        generation = busy_cache.generation
+        fetch_start, _ = day_bounds(missing[0])
+        _, fetch_end = day_bounds(missing[-1])
+        # identical concurrent misses share it; the generation in the key keeps
+        # requests that arrive after an invalidation off a query that predates it
+        rows = await coalesce_read(
+            db,
+            ("availability", tutor_id, fetch_start, fetch_end, generation),
+            lambda s: crud.list_busy_intervals(s, fetch_start, fetch_end, tutor_id=tutor_id),
+        )
+        intervals = [(as_utc(s), as_utc(e)) for s, e in rows]
+        for day in days[days.index(missing[0]):days.index(missing[-1]) + 1]:
+            lo, hi = day_bounds(day)
+            per_day[day] = tuple((s, e) for s, e in intervals if s < hi and e > lo)
+            # a write committed while we queried: serve this result, don't keep it
+            if busy_cache.generation == generation:
+                busy_cache.set(busy_key(tutor_id, day), per_day[day])
+    return [interval for day in days for interval in per_day[day]]
+
 @router.get("", response_model=List[Dict[str, Any]])
 async def list_availability(
+    request: Request,
     start: datetime,
     end:   datetime,
+    tutor_id: int | None = None,
     db:    AsyncSession = Depends(get_db),
 ):
-    slots = []
-    cur = start
-    while cur < end:
-        if WORK_START <= cur.time() < WORK_END:
-            slots.append({
-                "start": cur.isoformat(),
-                "end":   (cur + timedelta(minutes=SLOT_MINUTES)).isoformat(),
-                "extendedProps": {
-                    "kind":         "slot",
-                    "pricePerHour": PRICE_PER_HOUR_CENTS,
-                }
-            })
-        cur += timedelta(minutes=SLOT_MINUTES)
-
-    # fetch overlapping sessions
-    booked = await crud.list_sessions_between(db, start, end)
-
-    def overlaps(slot, session):
-        return not (
-            slot["end"]   <= session.start_time.isoformat() or
-            slot["start"] >= session.end_time.isoformat()
+    # every day in the window becomes a cache entry: keep one request from filling it
+    if as_utc(end) - as_utc(start) > timedelta(days=settings.AVAILABILITY_MAX_WINDOW_DAYS):
+        raise HTTPException(
+            status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Window may span at most {settings.AVAILABILITY_MAX_WINDOW_DAYS} days",
         )
 
-    free = [s for s in slots if not any(overlaps(s, bs) for bs in booked)]
+    # open slots are sold against the default tutor unless one is requested
+    if tutor_id is None:
+        tutor_id = settings.DEFAULT_TUTOR_ID
+
+    # booked time, mostly from the per-day cache
+    booked = await _busy_intervals(db, tutor_id, start, end)
+
+    free = free_slots(start, end, booked)
 
-    return [
+    extended_props = {
+        "kind":         "slot",
+        "pricePerHour": PRICE_PER_HOUR_CENTS,
+    }
+    return with_etag(request, json_rows([
         {
-            "id":            s["start"],
+            "id":            s.start.isoformat(),
             "title":         "Open Slot",
-            "start":         s["start"],
-            "end":           s["end"],
-            "price":         s["extendedProps"]["pricePerHour"],
-            "extendedProps": s["extendedProps"],
+            "start":         s.start.isoformat(),
+            "end":           s.end.isoformat(),
+            "price":         PRICE_PER_HOUR_CENTS,
+            "extendedProps": extended_props,
         }
         for s in free
-    ]
+    ]))
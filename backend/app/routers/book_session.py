@@ -4,7 +4,7 @@ from uuid import uuid4
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..database import get_db
+from ..database import get_uow
 from .. import crud, schemas, models
 
 router = APIRouter(tags=["booking"])
@@ -16,25 +16,20 @@ router = APIRouter(tags=["booking"])
 )
 async def book_session(
     signup_req: schemas.SessionSignupCreate,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_uow),
 ):
-    # 1) Ensure session exists
-    sess = await crud.get_session(db, signup_req.session_id)
-    if not sess:
-        raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Session not found")
-
-    # 2) Capacity check
-    current = await crud.count_session_signups(db, sess.id)
-    if current >= sess.max_participants:
-        raise HTTPException(status.HTTP_400_BAD_REQUEST, detail="Session is full")
-
-    # 3) Generate invite & create signup in one shot
+    # 1) Take a seat and create the signup in one atomic statement
     invite_code = uuid4().hex
-    signup = await crud.create_session_signup(
+    signup = await crud.reserve_seat(
         db,
         signup_req,
         invite_code=invite_code,
         is_paid=False,
     )
+    if signup:
+        return signup
 
-    return signup
\ No newline at end of file
+    # 2) Nothing reserved: tell a missing session apart from a full one
+    if not await crud.get_session(db, signup_req.session_id):
+        raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Session not found")
+    raise HTTPException(status.HTTP_400_BAD_REQUEST, detail="Session is full")
@@ -4,7 +4,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from .. import crud, schemas
-from ..database import get_db
+from ..database import get_db, get_uow
 
 router = APIRouter(prefix="/bookings", tags=["bookings"])
 
@@ -15,7 +15,7 @@ router = APIRouter(prefix="/bookings", tags=["bookings"])
 )
 async def create_booking_endpoint(
     booking_in: schemas.BookingCreate,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_uow),
 ):
     """
     Book a created session (e.g. for Zoom or Discord).
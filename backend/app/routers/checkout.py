@@ -10,6 +10,8 @@ from datetime import datetime
 from ..database import get_db
 from ..dependencies import get_current_user
 from ..config import settings
+from ..stripe_gateway import gateway
+from .. import crud
 
 # Initialize Stripe with the secret key from settings
 stripe.api_key = settings.STRIPE_API_KEY
@@ -38,12 +40,16 @@ async def create_checkout(
     if total_minutes <= 0:
         raise HTTPException(400, detail="End must be after start")
 
-    # 2) Prorate the price
+    # 2) Refuse a slot that's already booked, rather than take payment for it
+    if await crud.list_busy_intervals(db, start_dt, end_dt, tutor_id=settings.DEFAULT_TUTOR_ID):
+        raise HTTPException(409, detail="Slot is no longer available")
+
+    # 3) Prorate the price
     amount_cents = settings.PRICE_PER_HOUR_CENTS * total_minutes // 60
 
-    # 3) Create Stripe Checkout Session
+    # 4) Create Stripe Checkout Session
     try:
-        checkout = stripe.checkout.Session.create(
+        checkout = await gateway.create_checkout_session(
             payment_method_types=["card"],
             line_items=[{
                 "price_data": {
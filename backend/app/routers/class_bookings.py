@@ -3,11 +3,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import uuid4
-import stripe
+import time
 
-from ..database import get_db
+from ..database import get_db, get_read_db, get_uow
 from ..config import settings
 from ..dependencies import get_current_user
+from ..stripe_gateway import gateway
 from .. import crud, schemas
 
 router = APIRouter(prefix="/class", tags=["class_bookings"])
@@ -19,22 +20,21 @@ router = APIRouter(prefix="/class", tags=["class_bookings"])
 )
 async def book_class(
     signup_in: schemas.SessionSignupCreate,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_uow),
     user = Depends(get_current_user),
 ):
     session = await crud.get_session(db, signup_in.session_id)
     if not session:
         raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Session not found")
 
-    count = await crud.count_session_signups(db, session.id)
-    if count >= session.max_participants:
+    if session.seats_taken >= session.max_participants:
         raise HTTPException(status.HTTP_400_BAD_REQUEST, detail="Session is full")
 
     # 1) Generate invite code
     invite_code = uuid4().hex
 
     # 2) Create Stripe Checkout Session, embedding the invite_code in metadata
-    checkout = stripe.checkout.Session.create(
+    checkout = await gateway.create_checkout_session(
         line_items=[{
             "price_data": {
                 "currency": "usd",
@@ -46,22 +46,28 @@ async def book_class(
         mode="payment",
         success_url=f"{settings.FRONTEND_URL}/class/join?code={{CHECKOUT_SESSION_ID}}",
         cancel_url=settings.FRONTEND_URL,
-        metadata={"invite_code": invite_code},
+        # session/student let the worker re-take the seat if payment lands after the hold lapsed
+        metadata={
+            "invite_code": invite_code,
+            "session_id": str(session.id),
+            "student_id": str(signup_in.student_id),
+        },
+        # must lapse before the seat hold does, so a released seat can't be paid for
+        expires_at=int(time.time()) + settings.CHECKOUT_EXPIRY_SECONDS,
     )
 
-    # 3) Persist the signup record with stripe_session_id
-    signup = await crud.create_session_signup(
+    # 3) Atomically take the seat and persist the signup with stripe_session_id
+    signup = await crud.reserve_seat(
         db,
         signup_in,
         invite_code=invite_code,
         is_paid=False,
+        stripe_session_id=checkout.id,
+        stripe_checkout_url=checkout.url,
     )
-    signup.stripe_session_id = checkout.id
-    db.add(signup)
-    await db.commit()
-    await db.refresh(signup)
-
-    signup.stripe_checkout_url = checkout.url
+    if not signup:
+        # lost the race for the last seat; the unused checkout simply expires
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, detail="Session is full")
 
     return signup
 
@@ -71,18 +77,22 @@ async def book_class(
 )
 async def get_join(
     code: str,
+    read_db: AsyncSession = Depends(get_read_db),
     db: AsyncSession = Depends(get_db),
 ):
-    signup = await crud.get_signup_by_code(db, code)
-    if not signup or not signup.is_paid:
+    join = await crud.get_join_details(read_db, code)
+    if (not join or not join.is_paid) and read_db is not db:
+        # Stripe redirects here right after paying, often before the replica
+        # has the worker's commit; only the primary can say it's really unpaid
+        join = await crud.get_join_details(db, code)
+    if not join or not join.is_paid:
         raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Invalid or unpaid invite")
 
-    session = await crud.get_session(db, signup.session_id)
     return schemas.JoinClassOut(
-        session_id=session.id,
-        zoom_link=session.zoom_link,
-        discord_invite_link=signup.discord_invite_link or session.discord_invite_link,
-        price_per_seat=session.price_per_seat,
+        session_id=join.session_id,
+        zoom_link=join.zoom_link,
+        discord_invite_link=join.discord_invite_link,
+        price_per_seat=join.price_per_seat,
     )
 
 @router.post(
@@ -92,7 +102,7 @@ async def get_join(
 )
 async def join_class(
     payload: schemas.JoinClassIn,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_uow),
     user = Depends(get_current_user),
 ):
     original = await crud.get_signup_by_code(db, payload.invite_code)
@@ -102,15 +112,14 @@ async def join_class(
         raise HTTPException(status.HTTP_400_BAD_REQUEST, detail="Cannot join your own invite")
 
     session = await crud.get_session(db, original.session_id)
-    count = await crud.count_session_signups(db, session.id)
-    if count >= session.max_participants:
+    if session.seats_taken >= session.max_participants:
         raise HTTPException(status.HTTP_400_BAD_REQUEST, detail="Session is full")
 
     # 1) Generate new invite code for the friend
     invite_code = uuid4().hex
 
     # 2) Create Stripe Checkout Session with metadata
-    checkout = stripe.checkout.Session.create(
+    checkout = await gateway.create_checkout_session(
         line_items=[{
             "price_data": {
                 "currency": "usd",
@@ -122,19 +131,25 @@ async def join_class(
         mode="payment",
         success_url=f"{settings.FRONTEND_URL}/class/join?code={{CHECKOUT_SESSION_ID}}",
         cancel_url=settings.FRONTEND_URL,
-        metadata={"invite_code": invite_code},
+        metadata={
+            "invite_code": invite_code,
+            "session_id": str(session.id),
+            "student_id": str(user.id),
+        },
+        # must lapse before the seat hold does, so a released seat can't be paid for
+        expires_at=int(time.time()) + settings.CHECKOUT_EXPIRY_SECONDS,
     )
 
-    # 3) Persist the friend’s signup
-    signup = await crud.create_session_signup(
+    # 3) Atomically take the seat and persist the friend’s signup
+    signup = await crud.reserve_seat(
         db,
         schemas.SessionSignupCreate(student_id=user.id, session_id=session.id),
         invite_code=invite_code,
         is_paid=False,
+        stripe_session_id=checkout.id,
+        stripe_checkout_url=checkout.url,
     )
-    signup.stripe_session_id = checkout.id
-    db.add(signup)
-    await db.commit()
-    await db.refresh(signup)
+    if not signup:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, detail="Session is full")
 
     return signup
\ No newline at end of file
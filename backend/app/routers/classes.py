@@ -1,15 +1,39 @@
 #tutoring-platform\backend\app\routers\classes.py
 
 from typing import List
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 
+from ..classes import CATALOG_KEY, catalog_cache
 from ..database import get_db
+from ..serialization import json_rows
 from .. import models, schemas
 
 router = APIRouter(prefix="/classes", tags=["classes"])
 
+# Filter for class_group sessions instead of the removed is_class flag.
+# Columns are selected already in ClassRead's shape (defaults included),
+# so rows go straight to JSON without building models.
+CATALOG_QUERY = (
+    select(
+        models.Session.id,
+        func.coalesce(models.Session.title, "").label("title"),
+        func.coalesce(models.Session.day_of_week, 0).label("day_of_week"),
+        models.Session.start_time,
+        models.Session.end_time,
+        models.Session.price_per_seat,
+        models.Session.max_participants,
+        models.Session.seats_taken.label("current_bookings"),
+    )
+    .where(models.Session.session_type == models.SessionType.class_group)
+)
+
+async def fetch_classes(conn) -> bytes:
+    """Run the catalogue query on a session or connection; return the JSON body."""
+    result = await conn.execute(CATALOG_QUERY)
+    return json_rows(row._asdict() for row in result).body
+
 @router.get(
     "", 
     response_model=List[schemas.ClassRead],
@@ -18,38 +42,11 @@ async def list_classes(db: AsyncSession = Depends(get_db)):
     """
     List all fixed-schedule group classes with current booking counts.
     """
-    # Filter for class_group sessions instead of the removed is_class flag
-    stmt = (
-        select(
-            models.Session.id,
-            models.Session.title,
-            models.Session.day_of_week,
-            models.Session.start_time,
-            models.Session.end_time,
-            models.Session.price_per_seat,
-            models.Session.max_participants,
-            func.count(models.SessionSignup.id).label("current_bookings"),
-        )
-        .outerjoin(
-            models.SessionSignup,
-            models.Session.id == models.SessionSignup.session_id
-        )
-        .where(models.Session.session_type == models.SessionType.class_group)
-        .group_by(models.Session.id)
-    )
-    result = await db.execute(stmt)
-    rows = result.all()
+    async def load() -> bytes:
+        # its own connection: a background refresh outlives this request's session.
+        # Primary, not replica, so a refill right after a write sees that write.
+        async with db.bind.connect() as conn:
+            return await fetch_classes(conn)
 
-    return [
-        schemas.ClassRead(
-            id=row.id,
-            title=row.title or "",
-            day_of_week=row.day_of_week or 0,
-            start_time=row.start_time,
-            end_time=row.end_time,
-            price_per_seat=row.price_per_seat,
-            max_participants=row.max_participants,
-            current_bookings=row.current_bookings,
-        )
-        for row in rows
-    ]
+    body = await catalog_cache.get_or_load(CATALOG_KEY, load)
+    return Response(body, media_type="application/json")
@@ -0,0 +1,50 @@
+# backend/app/routers/events.py
+import asyncio
+
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
+
+from ..config import settings
+from ..events import hub
+from ..serialization import dumps
+
+router = APIRouter(tags=["events"])
+
+def _frame(event: dict) -> bytes:
+    data = {k: v for k, v in event.items() if k != "type"}
+    return b"event: " + event["type"].encode() + b"\ndata: " + dumps(data) + b"\n\n"
+
+@router.get("/events")
+async def stream_events(request: Request):
+    """
+    Server-sent event stream of seat counts and newly booked sessions,
+    as they are committed. Subscribe, then load /sessions and /classes and
+    apply these on top; seat counts are absolute, so one the snapshot
+    already includes changes nothing. Load again on "resync" or after
+    reconnecting.
+    """
+    async def frames():
+        queue = hub.subscribe()
+        try:
+            # EventSource reconnects after this many ms if the stream drops
+            yield b"retry: 3000\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        queue.get(), timeout=settings.EVENT_STREAM_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        return
+                    # keeps proxies from timing out an idle stream
+                    yield b": keepalive\n\n"
+                    continue
+                yield _frame(event)
+        finally:
+            hub.unsubscribe(queue)
+
+    return StreamingResponse(
+        frames(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,71 @@
+# backend/app/routers/metrics.py
+
+from fastapi import APIRouter, HTTPException
+
+from ..availability import busy_cache
+from ..classes import catalog_cache
+from ..database import engine, read_coalescer, read_engine
+from ..events import hub
+from ..invalidation import WORKER_ID, registry, stats as invalidation_stats
+from ..stripe_gateway import gateway
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+@router.get("/stripe")
+async def stripe_metrics():
+    """
+    Stripe gateway health: circuit breaker state, in-flight calls and
+    cumulative call/failure/retry/rejection counters for this worker.
+    """
+    return gateway.stats()
+
+@router.get("/db-pool")
+async def db_pool_metrics():
+    """
+    Connection pool health for this worker: checked-out, idle and overflow
+    connections, plus how long checkouts have waited and how many timed out.
+    """
+    return engine.pool.stats()
+
+@router.get("/db-pool/read")
+async def read_db_pool_metrics():
+    """Same as /metrics/db-pool, for the read replica's pool."""
+    if read_engine is None:
+        raise HTTPException(404, "No read replica configured")
+    return read_engine.pool.stats()
+
+@router.get("/availability-cache")
+async def availability_cache_metrics():
+    """Per-(tutor, day) busy-interval cache behind /availability: size, hit/miss and eviction counts."""
+    return busy_cache.stats()
+
+@router.get("/classes-cache")
+async def classes_cache_metrics():
+    """GET /classes cache: fresh and stale hits, misses, coalesced waits and background loads."""
+    return catalog_cache.stats()
+
+@router.get("/cache-invalidation")
+async def cache_invalidation_metrics():
+    """Cross-worker invalidation bus: messages published, received and applied by this worker."""
+    return {
+        "worker_id": WORKER_ID,
+        "caches": sorted(registry),
+        **invalidation_stats,
+    }
+
+@router.get("/coalescing")
+async def coalescing_metrics():
+    """
+    Read coalescing in this worker: queries actually run, requests that
+    shared another request's in-flight query (per endpoint), and the
+    /classes cache's shared loads.
+    """
+    stats = read_coalescer.stats()
+    stats["coalesced_by"]["classes"] = catalog_cache.coalesced
+    stats["coalesced"] += catalog_cache.coalesced
+    return stats
+
+@router.get("/events")
+async def event_stream_metrics():
+    """Live event stream: connected clients in this worker, events fanned out, and resyncs forced by slow clients."""
+    return hub.stats()
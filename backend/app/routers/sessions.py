@@ -1,14 +1,30 @@
 #tutoring-platform\backend\app\routers\sessions.py
+import base64
+from datetime import datetime
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 
 from .. import crud, schemas, models
-from ..database import get_db
+from ..database import coalesce_read, get_read_db, get_uow
+from ..serialization import json_rows, row_dicts
 
 router = APIRouter(prefix="/sessions", tags=["sessions"])
 
+MAX_PAGE_SIZE = 500
+
+def _encode_cursor(sess) -> str:
+    raw = f"{sess.start_time.isoformat()}|{sess.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        start, _, sid = base64.urlsafe_b64decode(cursor.encode()).decode().partition("|")
+        return datetime.fromisoformat(start), int(sid)
+    except ValueError:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
 @router.post(
     "",
     response_model=schemas.SessionRead,
@@ -16,25 +32,58 @@ router = APIRouter(prefix="/sessions", tags=["sessions"])
 )
 async def create_session_endpoint(
     session_in: schemas.SessionCreate,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_uow),
 ):
     """
     Create a new session time slot for a user.
     """
-    return await crud.create_session(db, session_in)
+    try:
+        return await crud.create_session(db, session_in)
+    except IntegrityError as e:
+        if "ex_sessions_tutor_id_no_overlap" not in str(e.orig):
+            raise
+        raise HTTPException(
+            status.HTTP_409_CONFLICT,
+            detail="Tutor already has a session in that time range",
+        )
 
 @router.get(
     "",
     response_model=List[schemas.SessionRead],
 )
 async def list_sessions(
-    db: AsyncSession = Depends(get_db),
+    start: datetime | None = None,
+    end: datetime | None = None,
+    tutor_id: int | None = None,
+    session_type: models.SessionType | None = None,
+    cursor: str | None = None,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
-    List all session time slots (1:1 and small-group).
+    List session time slots (1:1 and small-group) ordered by start time.
+
+    Filter by a [start, end) window, tutor and type. Results are paged with
+    a keyset cursor: when more rows exist, the `X-Next-Cursor` header carries
+    the value to pass back as `cursor` for the next page.
     """
-    result = await db.execute(select(models.Session))
-    return result.scalars().all()
+    after = _decode_cursor(cursor) if cursor else None
+    rows = await crud.list_sessions_page(
+        db,
+        start=start,
+        end=end,
+        tutor_id=tutor_id,
+        session_type=session_type,
+        after=after,
+        limit=limit + 1,
+    )
+    headers = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers = {"X-Next-Cursor": _encode_cursor(rows[-1])}
+
+    # Core rows already in SessionRead's shape: encode them directly
+    return json_rows(row_dicts(rows), headers=headers)
 
 @router.get(
     "/{session_id}",
@@ -42,12 +91,14 @@ async def list_sessions(
 )
 async def read_session(
     session_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Fetch one session by ID, or 404 if not found.
     """
-    sess = await crud.get_session(db, session_id)
+    sess = await coalesce_read(
+        db, ("session", session_id), lambda s: crud.get_session(s, session_id)
+    )
     if not sess:
         raise HTTPException(status.HTTP_404_NOT_FOUND, "Session not found")
     return sess
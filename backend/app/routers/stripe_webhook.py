@@ -1,20 +1,32 @@
 # backend/app/routers/stripe_webhook.py
 
+import json
+
 from fastapi import APIRouter, Request, HTTPException, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 import stripe
 
+from ..cache import LRUCache
 from ..config import settings
 from ..database import get_db
-from ..crud import get_signup_by_code, mark_signup_paid, create_session
+from ..crud import enqueue_webhook_event
+from ..webhook_worker import notify
 
 router = APIRouter(prefix="/webhook", tags=["webhook"])
 
+# Stripe ids of events this process has already stored; the inbox's unique
+# event_id is the source of truth, this just spares redeliveries a round trip.
+seen_events = LRUCache(settings.WEBHOOK_DEDUP_CACHE_SIZE)
+
 @router.post("/stripe")
 async def stripe_webhook(
     request: Request,
     db: AsyncSession = Depends(get_db),
 ):
+    """
+    Verify the signature, park the event in the inbox and acknowledge at once.
+    Fulfilment happens in app.webhook_worker, so Stripe never waits on it.
+    """
     payload    = await request.body()
     sig_header = request.headers.get("stripe-signature", "")
     try:
@@ -24,24 +36,19 @@ async def stripe_webhook(
     except (ValueError, stripe.error.SignatureVerificationError):
         raise HTTPException(status_code=400, detail="Invalid webhook signature")
 
-    if event["type"] == "checkout.session.completed":
-        session_obj = event["data"]["object"]
-        metadata    = session_obj.get("metadata", {})
-
-        # 1) Handle fixed “class” bookings via invite_code
-        invite_code = metadata.get("invite_code")
-        if invite_code:
-            signup = await get_signup_by_code(db, invite_code)
-            if signup:
-                await mark_signup_paid(db, signup.id)
-            return {"status": "ok"}
-
-        # 2) Handle ad-hoc slot bookings via user_id/start/end
-        user_id = metadata.get("user_id")
-        start   = metadata.get("start")
-        end     = metadata.get("end")
-        if user_id and start and end:
-            await create_session(db, user_id=int(user_id), start=start, end=end)
-            return {"status": "ok"}
-
-    return {"status": "ignored"}
+    if event["type"] != "checkout.session.completed":
+        return {"status": "ignored"}
+
+    if event["id"] in seen_events:
+        return {"status": "duplicate"}
+
+    inserted = await enqueue_webhook_event(
+        db, event["id"], event["type"], json.loads(payload)
+    )
+    # commit before waking the workers, so they can see the row
+    await db.commit()
+    seen_events.add(event["id"])
+    if not inserted:
+        return {"status": "duplicate"}
+    notify()
+    return {"status": "ok"}
@@ -4,12 +4,12 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from .. import crud, schemas
-from ..database import get_db
+from ..database import get_db, get_uow
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 @router.post("", response_model=schemas.UserRead, status_code=status.HTTP_201_CREATED)
-async def create_user_endpoint(user_in: schemas.UserCreate, db: AsyncSession = Depends(get_db)):
+async def create_user_endpoint(user_in: schemas.UserCreate, db: AsyncSession = Depends(get_uow)):
     return await crud.create_user(db, user_in)
 
 @router.get("/{user_id}", response_model=schemas.UserRead)
@@ -1,5 +1,5 @@
 # backend/app/schemas.py
-from pydantic import BaseModel, EmailStr, ConfigDict
+from pydantic import AliasChoices, BaseModel, EmailStr, ConfigDict, Field
 from datetime import datetime
 from typing import Optional
 from .models import SessionType
@@ -49,6 +49,10 @@ class SessionRead(BaseModel):
     discord_channel_id: Optional[str]
     discord_invite_link: Optional[str]
     created_at: datetime
+    current_bookings: int = Field(
+        default=0,
+        validation_alias=AliasChoices("current_bookings", "seats_taken"),
+    )
 
     model_config = ConfigDict(env_file=".env")
 
@@ -0,0 +1,65 @@
+# backend/app/serialization.py
+"""
+Fast JSON path for large listings.
+
+FastAPI normally validates a handler's return value against its
+response_model, turns it into plain Python, and only then encodes it.
+For big read-only listings whose rows come straight from our own schema,
+that validation is pure overhead. These helpers build plain dicts from
+the rows and hand them to orjson in one pass; returning the resulting
+Response directly makes FastAPI skip response_model processing (the
+model still documents the endpoint in OpenAPI).
+
+Every orjson body in the app goes through dumps, which writes UTC
+datetimes with a "Z" suffix exactly as pydantic does, so a fast-path
+listing and a response_model endpoint render the same row identically.
+
+with_etag adds a content-hash ETag so clients can revalidate a listing
+and get an empty 304 when nothing changed.
+"""
+import hashlib
+from typing import Any, Iterable, Mapping
+
+import orjson
+from fastapi import Request, Response
+from fastapi.responses import ORJSONResponse
+
+JSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_UTC_Z
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, option=JSON_OPTIONS)
+
+class AppJSONResponse(ORJSONResponse):
+    """ORJSONResponse with pydantic's datetime format; the app's default response class."""
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+def row_dicts(rows: list[Any]) -> list[dict[str, Any]]:
+    """Core rows (or any named tuples) to dicts, reading the field names once."""
+    if not rows:
+        return []
+    keys = rows[0]._fields
+    return [dict(zip(keys, row)) for row in rows]
+
+def json_rows(
+    rows: Iterable[Mapping[str, Any]] | list[Any],
+    headers: Mapping[str, str] | None = None,
+) -> AppJSONResponse:
+    """Encode already-shaped rows without response_model re-validation."""
+    return AppJSONResponse(rows if isinstance(rows, list) else list(rows), headers=headers)
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag in tags or "*" in tags
+
+def with_etag(request: Request, response: Response) -> Response:
+    """Tag an encoded response with a hash of its body; 304 if the client has it."""
+    etag = f'"{hashlib.blake2b(response.body, digest_size=16).hexdigest()}"'
+    # no-cache: browsers may keep the body but must revalidate before reuse
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return response
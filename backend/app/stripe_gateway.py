@@ -0,0 +1,211 @@
+# backend/app/stripe_gateway.py
+"""
+Async facade over the (blocking) Stripe SDK.
+
+SDK calls run on a dedicated, bounded thread pool so a slow Stripe round trip
+never blocks the event loop. At most STRIPE_MAX_CONCURRENCY calls are in
+flight per worker; further callers wait in the pool's queue.
+
+Calls share one keep-alive connection pool with explicit timeouts, transient
+failures are retried a bounded number of times with jittered backoff, and a
+circuit breaker short-circuits calls while Stripe is unhealthy so requests
+fail fast with StripeUnavailable instead of tying up workers.
+"""
+import asyncio
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any
+from uuid import uuid4
+
+import requests
+import stripe
+from requests.adapters import HTTPAdapter
+
+from .config import settings
+
+class StripeUnavailable(Exception):
+    """Stripe is failing or the breaker is open; surfaced to clients as 503."""
+
+    def __init__(self, message: str, retry_after: float | None = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+def _is_transient(exc: Exception) -> bool:
+    """Network errors, rate limits and 5xx are worth retrying; card/validation errors are not."""
+    if isinstance(exc, (stripe.error.APIConnectionError, stripe.error.RateLimitError)):
+        return True
+    if isinstance(exc, stripe.error.StripeError):
+        return (exc.http_status or 0) >= 500
+    return False
+
+class CircuitBreaker:
+    """
+    Classic closed → open → half-open breaker, driven from the event loop.
+
+    After failure_threshold consecutive transient failures the breaker opens
+    and rejects calls for reset_timeout seconds, then lets a single trial
+    call through; its outcome closes or re-opens the breaker.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: float | None = None
+        self._trial_in_flight = False
+
+    def retry_after(self) -> float:
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def allow(self) -> bool:
+        if self.state == self.OPEN and self.retry_after() == 0.0:
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN:
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+        return self.state == self.CLOSED
+
+    def record_success(self) -> None:
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        self._trial_in_flight = False
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def release_trial(self) -> None:
+        """Free the half-open slot of a trial that ended without an outcome (e.g. cancelled)."""
+        self._trial_in_flight = False
+
+class StripeGateway:
+    def __init__(
+        self,
+        api_key: str,
+        *,
+        max_concurrency: int = 8,
+        api_base: str | None = None,
+        timeout: float = 10.0,
+        max_retries: int = 2,
+        backoff_base: float = 0.25,
+        breaker: CircuitBreaker | None = None,
+    ):
+        self.api_key = api_key
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.breaker = breaker or CircuitBreaker()
+        if api_base:
+            # e.g. scripts/fake_stripe.py for tests and benchmarks
+            stripe.api_base = api_base
+
+        # one keep-alive pool, as wide as the thread pool that uses it
+        session = requests.Session()
+        session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency))
+        session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency))
+        stripe.default_http_client = stripe.RequestsClient(timeout=timeout, session=session)
+        # retries are ours (bounded, jittered, breaker-aware), not the SDK's
+        stripe.max_network_retries = 0
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="stripe"
+        )
+        self.in_flight = 0
+        self.calls = 0
+        self.failures = 0
+        self.retries = 0
+        self.rejected = 0
+
+    def _backoff(self, attempt: int) -> float:
+        # "full jitter": uniform over [0, base * 2^attempt]
+        return random.uniform(0, self.backoff_base * (2 ** attempt))
+
+    async def _call(self, fn, /, **params: Any):
+        if not self.breaker.allow():
+            self.rejected += 1
+            raise StripeUnavailable(
+                "Payment provider unavailable", retry_after=self.breaker.retry_after()
+            )
+
+        trial = self.breaker.state == CircuitBreaker.HALF_OPEN
+        try:
+            return await self._attempts(fn, params)
+        finally:
+            # a cancelled trial records no outcome; don't leave the breaker waiting on it
+            if trial:
+                self.breaker.release_trial()
+
+    async def _attempts(self, fn, params: dict[str, Any]):
+        loop = asyncio.get_running_loop()
+        # the same key on every attempt makes retried POSTs safe
+        params.setdefault("idempotency_key", uuid4().hex)
+        call = partial(fn, api_key=self.api_key, **params)
+        attempt = 0
+        while True:
+            self.calls += 1
+            self.in_flight += 1
+            try:
+                result = await loop.run_in_executor(self._executor, call)
+            except Exception as exc:
+                if not _is_transient(exc):
+                    # the provider answered; this request is just invalid
+                    self.breaker.record_success()
+                    raise
+                self.failures += 1
+                self.breaker.record_failure()
+                if attempt >= self.max_retries or self.breaker.state == CircuitBreaker.OPEN:
+                    raise StripeUnavailable(
+                        "Payment provider unavailable", retry_after=self.breaker.retry_after()
+                    ) from exc
+                attempt += 1
+                self.retries += 1
+                await asyncio.sleep(self._backoff(attempt))
+                continue
+            finally:
+                self.in_flight -= 1
+            self.breaker.record_success()
+            return result
+
+    async def create_checkout_session(self, **params: Any) -> stripe.checkout.Session:
+        return await self._call(stripe.checkout.Session.create, **params)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "breaker_state": self.breaker.state,
+            "consecutive_failures": self.breaker.consecutive_failures,
+            "retry_after_seconds": round(self.breaker.retry_after(), 3),
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "calls": self.calls,
+            "failures": self.failures,
+            "retries": self.retries,
+            "rejected": self.rejected,
+        }
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+gateway = StripeGateway(
+    settings.STRIPE_API_KEY,
+    max_concurrency=settings.STRIPE_MAX_CONCURRENCY,
+    api_base=settings.STRIPE_API_BASE,
+    timeout=settings.STRIPE_TIMEOUT_SECONDS,
+    max_retries=settings.STRIPE_MAX_RETRIES,
+    breaker=CircuitBreaker(
+        failure_threshold=settings.STRIPE_BREAKER_FAILURE_THRESHOLD,
+        reset_timeout=settings.STRIPE_BREAKER_RESET_SECONDS,
+    ),
+)
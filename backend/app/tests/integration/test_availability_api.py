@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+
+from app.availability import busy_cache, busy_key
+from app.schemas import SessionCreate
+
+DAY = datetime(2033, 3, 7, tzinfo=timezone.utc)
+WINDOW = {"start": DAY.isoformat(), "end": (DAY + timedelta(days=2)).isoformat(), "tutor_id": 7}
+
+@pytest.mark.asyncio
+async def test_availability_is_cached_revalidated_and_invalidated(init_db_and_client):
+    client = init_db_and_client
+    busy_cache.clear()
+
+    first = await client.get("/availability", params=WINDOW)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    slots = {slot["start"] for slot in first.json()}
+    assert (DAY + timedelta(hours=10)).isoformat() in slots
+
+    # unchanged: served from the cache, and the client's copy is still good
+    hits = busy_cache.hits
+    again = await client.get("/availability", params=WINDOW, headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.headers["etag"] == etag
+    assert busy_cache.hits == hits + 2      # both days
+
+    start = DAY + timedelta(hours=10)
+    created = await client.post("/sessions", json=jsonable_encoder(SessionCreate(
+        tutor_id=7, session_type="one_on_one", start_time=start, end_time=start + timedelta(hours=1),
+    )))
+    assert created.status_code == 201
+    assert busy_key(7, DAY.date()) not in busy_cache
+    assert busy_key(7, DAY.date() + timedelta(days=1)) in busy_cache     # other day untouched
+
+    changed = await client.get("/availability", params=WINDOW, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert start.isoformat() not in {slot["start"] for slot in changed.json()}
+
+@pytest.mark.asyncio
+async def test_availability_rejects_windows_past_the_cap(init_db_and_client):
+    client = init_db_and_client
+    size = len(busy_cache)
+
+    resp = await client.get("/availability", params={
+        "start": DAY.isoformat(), "end": (DAY + timedelta(days=3650)).isoformat(), "tutor_id": 7,
+    })
+    assert resp.status_code == 422
+    assert len(busy_cache) == size      # nothing queried, nothing cached
+
+    resp = await client.get("/availability", params={
+        "start": DAY.isoformat(), "end": (DAY + timedelta(days=62)).isoformat(), "tutor_id": 7,
+    })
+    assert resp.status_code == 200
@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+
+from app.classes import catalog_cache
+from app.events import hub
+from app.schemas import SessionCreate
+
+@pytest.mark.asyncio
+async def test_class_listing_is_cached_until_a_write_commits(init_db_and_client):
+    client = init_db_and_client
+    catalog_cache.clear()
+    before = (await client.get("/classes")).json()
+
+    start = datetime(2034, 9, 4, 17, tzinfo=timezone.utc)
+    created = await client.post("/sessions", json=jsonable_encoder(SessionCreate(
+        tutor_id=11, session_type="class_group", title="Algebra",
+        start_time=start, end_time=start + timedelta(hours=1), max_participants=4,
+    )))
+    assert created.status_code == 201
+    class_id = created.json()["id"]
+
+    # the new class shows up at once, then repeat reads come from the cache
+    listing = (await client.get("/classes")).json()
+    assert len(listing) == len(before) + 1
+    loads = catalog_cache.loads
+    assert (await client.get("/classes")).json() == listing
+    assert catalog_cache.loads == loads
+
+    live = hub.subscribe()
+    try:
+        for seats_taken in (1, 2):
+            booked = await client.post("/book-session", json={"student_id": 12, "session_id": class_id})
+            assert booked.status_code == 201
+            # absolute counts, so a client can apply one twice without drifting
+            assert live.get_nowait() == {"type": "seats", "session_id": class_id, "seats_taken": seats_taken}
+    finally:
+        hub.unsubscribe(live)
+    row = next(c for c in (await client.get("/classes")).json() if c["id"] == class_id)
+    assert row["current_bookings"] == 2
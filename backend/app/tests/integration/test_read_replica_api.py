@@ -0,0 +1,75 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import pytest_asyncio
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, database
+from app.database import Base, PRIMARY_STICKY_COOKIE, get_db
+from app.main import app
+from app.schemas import SessionCreate, SessionSignupCreate
+
+@pytest_asyncio.fixture
+async def replica(monkeypatch):
+    # an empty "replica" that never receives the primary's writes
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    monkeypatch.setattr(
+        database, "ReadSessionLocal",
+        sessionmaker(engine, class_=AsyncSession, expire_on_commit=False),
+    )
+    yield
+    await engine.dispose()
+
+@pytest.mark.asyncio
+async def test_reads_go_to_replica_except_right_after_own_write(init_db_and_client, replica):
+    client = init_db_and_client
+    start = datetime(2030, 4, 1, 15, tzinfo=timezone.utc)
+    created = await client.post("/sessions", json=jsonable_encoder(SessionCreate(
+        tutor_id=1, session_type="class_group",
+        start_time=start, end_time=start + timedelta(hours=1), max_participants=3,
+    )))
+    assert created.status_code == 201
+    assert PRIMARY_STICKY_COOKIE in created.cookies
+    sess_id = created.json()["id"]
+
+    # the writer reads its own write from the primary
+    assert (await client.get(f"/sessions/{sess_id}")).status_code == 200
+
+    # anyone else (or the writer once the window lapses) reads the replica
+    client.cookies.set(PRIMARY_STICKY_COOKIE, str(int(time.time()) - 1))
+    assert (await client.get(f"/sessions/{sess_id}")).status_code == 404
+    client.cookies.clear()
+    assert (await client.get(f"/sessions/{sess_id}")).status_code == 404
+
+@pytest.mark.asyncio
+async def test_join_falls_back_to_primary_until_replica_has_the_payment(init_db_and_client, replica):
+    client = init_db_and_client
+    start = datetime(2030, 4, 2, 15, tzinfo=timezone.utc)
+    created = await client.post("/sessions", json=jsonable_encoder(SessionCreate(
+        tutor_id=1, session_type="class_group",
+        start_time=start, end_time=start + timedelta(hours=1), max_participants=3,
+    )))
+    signup = await client.post("/book-session", json=SessionSignupCreate(
+        student_id=1, session_id=created.json()["id"],
+    ).model_dump())
+    code = signup.json()["invite_code"]
+
+    # the webhook worker marks it paid on the primary; the replica hasn't caught up
+    db_gen = app.dependency_overrides[get_db]()
+    db = await anext(db_gen)
+    try:
+        await crud.mark_signups_paid_by_codes(db, [code])
+        await db.commit()
+    finally:
+        await db_gen.aclose()
+
+    client.cookies.clear()
+    joined = await client.get("/class/join", params={"code": code})
+    assert joined.status_code == 200
+    assert joined.json()["session_id"] == created.json()["id"]
+    assert (await client.get("/class/join", params={"code": "nope"})).status_code == 404
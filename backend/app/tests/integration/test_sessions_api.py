@@ -1,7 +1,7 @@
 import pytest
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from fastapi.encoders import jsonable_encoder
-from app.schemas import UserCreate, SessionCreate
+from app.schemas import UserCreate, SessionCreate, SessionSignupCreate
 
 @pytest.mark.asyncio
 async def test_post_and_get_session(init_db_and_client):
@@ -43,3 +43,82 @@ async def test_post_session_validation_errors(init_db_and_client, payload):
     client = init_db_and_client
     resp = await client.post("/sessions", json=payload)
     assert resp.status_code == 422
+
+@pytest.mark.asyncio
+async def test_list_sessions_keyset_pagination(init_db_and_client):
+    client = init_db_and_client
+
+    u = await client.post("/users", json=UserCreate(email="page@int.com", name="Pager").model_dump())
+    tutor_id = u.json()["id"]
+
+    base = datetime(2030, 1, 7, 9, tzinfo=timezone.utc)
+    for h in (2, 0, 1):
+        payload = jsonable_encoder(SessionCreate(
+            tutor_id=tutor_id,
+            session_type="one_on_one",
+            start_time=base + timedelta(hours=h),
+            end_time=base + timedelta(hours=h, minutes=45),
+        ))
+        assert (await client.post("/sessions", json=payload)).status_code == 201
+
+    # first page: two earliest sessions plus a cursor
+    first = await client.get("/sessions", params={"tutor_id": tutor_id, "limit": 2})
+    assert first.status_code == 200
+    assert [s["start_time"][11:13] for s in first.json()] == ["09", "10"]
+    cursor = first.headers["x-next-cursor"]
+
+    # second page: the remaining session, no further cursor
+    second = await client.get("/sessions", params={"tutor_id": tutor_id, "limit": 2, "cursor": cursor})
+    assert [s["start_time"][11:13] for s in second.json()] == ["11"]
+    assert "x-next-cursor" not in second.headers
+
+    # window filter only returns overlapping sessions
+    window = await client.get("/sessions", params={
+        "tutor_id": tutor_id,
+        "start": (base + timedelta(hours=1)).isoformat(),
+        "end": (base + timedelta(hours=2)).isoformat(),
+    })
+    assert len(window.json()) == 1
+
+@pytest.mark.asyncio
+async def test_list_sessions_rejects_bad_cursor(init_db_and_client):
+    client = init_db_and_client
+    resp = await client.get("/sessions", params={"cursor": "not-a-cursor"})
+    assert resp.status_code == 400
+
+@pytest.mark.asyncio
+async def test_list_sessions_includes_current_bookings(init_db_and_client):
+    client = init_db_and_client
+
+    u = await client.post("/users", json=UserCreate(email="seats@int.com", name="Seats").model_dump())
+    tutor_id = u.json()["id"]
+
+    start = datetime(2030, 2, 4, 15, tzinfo=timezone.utc)
+    sids = []
+    for h in (0, 2):
+        payload = jsonable_encoder(SessionCreate(
+            tutor_id=tutor_id,
+            session_type="small_group",
+            start_time=start + timedelta(hours=h),
+            end_time=start + timedelta(hours=h + 1),
+            max_participants=3,
+        ))
+        sids.append((await client.post("/sessions", json=payload)).json()["id"])
+
+    for _ in range(2):
+        resp = await client.post(
+            "/book-session",
+            json=SessionSignupCreate(student_id=tutor_id, session_id=sids[0]).model_dump(),
+        )
+        assert resp.status_code == 201
+
+    listing = await client.get("/sessions", params={"tutor_id": tutor_id})
+    counts = {s["id"]: s["current_bookings"] for s in listing.json()}
+    assert counts == {sids[0]: 2, sids[1]: 0}
+
+    one = await client.get(f"/sessions/{sids[0]}")
+    assert one.json()["current_bookings"] == 2
+
+    # the listing's direct-to-JSON rows match the validated SessionRead output
+    # (SQLite returns naive datetimes; test_serialization checks aware ones)
+    assert listing.json()[0] == one.json()
@@ -0,0 +1,295 @@
+import hashlib
+import hmac
+import json
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select
+
+from app import crud, models
+from app.config import settings
+from app.database import get_db
+from app.dependencies import get_current_user
+from app.main import app
+from app.routers.stripe_webhook import seen_events
+from app.schemas import UserCreate, SessionCreate, SessionSignupCreate
+from app.webhook_worker import process_batch
+
+def _signed(event: dict) -> tuple[bytes, dict]:
+    payload = json.dumps(event).encode()
+    ts = int(time.time())
+    sig = hmac.new(
+        settings.STRIPE_WEBHOOK_SECRET.encode(), f"{ts}.".encode() + payload, hashlib.sha256
+    ).hexdigest()
+    return payload, {"stripe-signature": f"t={ts},v1={sig}", "content-type": "application/json"}
+
+def _checkout_completed(event_id: str, metadata: dict) -> dict:
+    return {
+        "id": event_id,
+        "object": "event",
+        "type": "checkout.session.completed",
+        "data": {"object": {"id": f"cs_{event_id}", "object": "checkout.session", "metadata": metadata}},
+    }
+
+async def _drain():
+    db_gen = app.dependency_overrides[get_db]()
+    db = await anext(db_gen)
+    try:
+        return await process_batch(db)
+    finally:
+        await db_gen.aclose()
+
+async def _reap():
+    """Run the hold reaper as if every hold had lapsed."""
+    db_gen = app.dependency_overrides[get_db]()
+    db = await anext(db_gen)
+    try:
+        released = await crud.release_expired_holds(
+            db, now=datetime.now(timezone.utc) + timedelta(days=1)
+        )
+        await db.commit()
+        return released
+    finally:
+        await db_gen.aclose()
+
+async def _class_session(client, email: str, day: int, seats: int) -> tuple[int, int]:
+    u = await client.post("/users", json=UserCreate(email=email, name="Class").model_dump())
+    start = datetime(2030, 4, day, 15, tzinfo=timezone.utc)
+    sess = await client.post("/sessions", json=jsonable_encoder(SessionCreate(
+        tutor_id=u.json()["id"], session_type="class_group",
+        start_time=start, end_time=start + timedelta(hours=1), max_participants=seats,
+    )))
+    return u.json()["id"], sess.json()["id"]
+
+async def _held_signup(uid: int, session_id: int, code: str) -> None:
+    """A signup waiting on checkout cs_<code>, as POST /class/book leaves it."""
+    db_gen = app.dependency_overrides[get_db]()
+    db = await anext(db_gen)
+    try:
+        await crud.reserve_seat(
+            db, SessionSignupCreate(student_id=uid, session_id=session_id), code,
+            stripe_session_id=f"cs_{code}",
+        )
+        await db.commit()
+    finally:
+        await db_gen.aclose()
+
+@pytest.mark.asyncio
+async def test_webhook_acks_then_worker_marks_signup_paid(init_db_and_client):
+    client = init_db_and_client
+
+    u = await client.post("/users", json=UserCreate(email="hook@int.com", name="Hook").model_dump())
+    uid = u.json()["id"]
+    start = datetime(2030, 3, 4, 15, tzinfo=timezone.utc)
+    sess = await client.post("/sessions", json=jsonable_encoder(SessionCreate(
+        tutor_id=uid, session_type="class_group",
+        start_time=start, end_time=start + timedelta(hours=1), max_participants=5,
+    )))
+    signup = await client.post(
+        "/book-session",
+        json=SessionSignupCreate(student_id=uid, session_id=sess.json()["id"]).model_dump(),
+    )
+    code = signup.json()["invite_code"]
+
+    payload, headers = _signed(_checkout_completed("evt_hook_1", {"invite_code": code}))
+    resp = await client.post("/webhook/stripe", content=payload, headers=headers)
+    assert resp.status_code == 200
+    assert resp.json() == {"status": "ok"}
+
+    # acknowledged, but not fulfilled until the worker runs
+    assert (await client.get("/class/join", params={"code": code})).status_code == 404
+
+    # a redelivery is answered from memory without queueing a second copy
+    resp = await client.post("/webhook/stripe", content=payload, headers=headers)
+    assert resp.status_code == 200
+    assert resp.json() == {"status": "duplicate"}
+
+    # ...and after a restart (empty cache) the inbox's unique key catches it
+    seen_events.clear()
+    resp = await client.post("/webhook/stripe", content=payload, headers=headers)
+    assert resp.json() == {"status": "duplicate"}
+
+    assert await _drain() == 1
+    joined = await client.get("/class/join", params={"code": code})
+    assert joined.status_code == 200
+    assert joined.json()["session_id"] == sess.json()["id"]
+    assert await _drain() == 0
+
+@pytest.mark.asyncio
+async def test_book_session_signup_survives_the_hold_reaper(init_db_and_client):
+    client = init_db_and_client
+    uid, session_id = await _class_session(client, "free@int.com", day=1, seats=2)
+
+    signup = await client.post(
+        "/book-session", json=SessionSignupCreate(student_id=uid, session_id=session_id).model_dump(),
+    )
+    assert signup.status_code == 201
+
+    assert await _reap() == 0
+    listed = await client.get("/sessions", params={
+        "start": "2030-04-01T00:00:00+00:00", "end": "2030-04-02T00:00:00+00:00",
+    })
+    assert [s["current_bookings"] for s in listed.json() if s["id"] == session_id] == [1]
+
+@pytest.mark.asyncio
+async def test_payment_after_reaped_hold_retakes_seat_or_is_flagged(init_db_and_client):
+    client = init_db_and_client
+    uid, session_id = await _class_session(client, "lapsed@int.com", day=2, seats=1)
+
+    await _held_signup(uid, session_id, "lapsed-1")
+    assert await _reap() == 1
+
+    # the seat is still free, so the late payment takes it back
+    event = _checkout_completed("evt_lapsed_1", {
+        "invite_code": "lapsed-1", "session_id": str(session_id), "student_id": str(uid),
+    })
+    event["data"]["object"]["id"] = "cs_lapsed-1"
+    payload, headers = _signed(event)
+    await client.post("/webhook/stripe", content=payload, headers=headers)
+    assert await _drain() == 1
+    joined = await client.get("/class/join", params={"code": "lapsed-1"})
+    assert joined.status_code == 200
+
+    # this time someone else takes the seat first: nothing to give back but the money
+    uid2, session_id2 = await _class_session(client, "lapsed2@int.com", day=3, seats=1)
+    await _held_signup(uid2, session_id2, "lapsed-2")
+    await _reap()
+    await client.post(
+        "/book-session", json=SessionSignupCreate(student_id=uid2, session_id=session_id2).model_dump(),
+    )
+    payload, headers = _signed(_checkout_completed("evt_lapsed_2", {
+        "invite_code": "lapsed-2", "session_id": str(session_id2), "student_id": str(uid2),
+    }))
+    await client.post("/webhook/stripe", content=payload, headers=headers)
+    assert await _drain() == 1
+    assert (await client.get("/class/join", params={"code": "lapsed-2"})).status_code == 404
+
+    db_gen = app.dependency_overrides[get_db]()
+    db = await anext(db_gen)
+    try:
+        flagged = await db.scalar(
+            select(models.StripeWebhookEvent).where(models.StripeWebhookEvent.event_id == "evt_lapsed_2")
+        )
+    finally:
+        await db_gen.aclose()
+    assert flagged.processed_at is not None
+    assert "refund cs_evt_lapsed_2" in flagged.last_error
+    assert await _drain() == 0
+
+@pytest.mark.asyncio
+async def test_adhoc_payment_for_a_taken_slot_is_flagged_not_retried(init_db_and_client, monkeypatch):
+    client = init_db_and_client
+
+    async def slot_taken(db, **kwargs):
+        raise crud.SlotTaken("tutor 1 is already booked")
+    monkeypatch.setattr(crud, "create_one_off_session_and_signup", slot_taken)
+
+    payload, headers = _signed(_checkout_completed("evt_taken", {
+        "user_id": "1", "start": "2030-03-07T15:00:00+00:00", "end": "2030-03-07T16:00:00+00:00",
+    }))
+    await client.post("/webhook/stripe", content=payload, headers=headers)
+    assert await _drain() == 1
+
+    db_gen = app.dependency_overrides[get_db]()
+    db = await anext(db_gen)
+    try:
+        flagged = await db.scalar(
+            select(models.StripeWebhookEvent).where(models.StripeWebhookEvent.event_id == "evt_taken")
+        )
+    finally:
+        await db_gen.aclose()
+    assert flagged.processed_at is not None and flagged.attempts == 1
+    assert flagged.last_error == "tutor 1 is already booked; refund cs_evt_taken"
+    assert await _drain() == 0
+
+@pytest.mark.asyncio
+async def test_event_out_of_attempts_is_stamped_dead(init_db_and_client, monkeypatch):
+    client = init_db_and_client
+
+    async def broken(db, **kwargs):
+        raise RuntimeError("tutor calendar offline")
+    monkeypatch.setattr(crud, "create_one_off_session_and_signup", broken)
+    monkeypatch.setattr(settings, "WEBHOOK_MAX_ATTEMPTS", 2)
+
+    payload, headers = _signed(_checkout_completed("evt_flaky", {
+        "user_id": "1", "start": "2030-03-09T15:00:00+00:00", "end": "2030-03-09T16:00:00+00:00",
+    }))
+    await client.post("/webhook/stripe", content=payload, headers=headers)
+    assert await _drain() == 1      # first failure: retried
+    assert await _drain() == 1      # second: the last attempt
+    assert await _drain() == 0
+
+    db_gen = app.dependency_overrides[get_db]()
+    db = await anext(db_gen)
+    try:
+        dead = await db.scalar(
+            select(models.StripeWebhookEvent).where(models.StripeWebhookEvent.event_id == "evt_flaky")
+        )
+    finally:
+        await db_gen.aclose()
+    assert dead.processed_at is not None and dead.attempts == 2
+    assert dead.last_error.startswith("gave up after 2 attempts: RuntimeError")
+
+@pytest.mark.asyncio
+async def test_checkout_refuses_a_booked_slot(init_db_and_client):
+    client = init_db_and_client
+    start = datetime(2030, 3, 8, 15, tzinfo=timezone.utc)
+    await client.post("/sessions", json=jsonable_encoder(SessionCreate(
+        tutor_id=settings.DEFAULT_TUTOR_ID, session_type="one_on_one",
+        start_time=start, end_time=start + timedelta(hours=1), max_participants=1,
+    )))
+
+    app.dependency_overrides[get_current_user] = lambda: None
+    try:
+        resp = await client.post("/create-checkout-session", json={
+            "start": (start + timedelta(minutes=30)).isoformat(),
+            "end": (start + timedelta(minutes=90)).isoformat(),
+        })
+    finally:
+        del app.dependency_overrides[get_current_user]
+    assert resp.status_code == 409
+
+@pytest.mark.asyncio
+async def test_webhook_ignores_other_events_and_rejects_bad_signatures(init_db_and_client):
+    client = init_db_and_client
+
+    event = {"id": "evt_other", "object": "event", "type": "invoice.paid", "data": {"object": {}}}
+    payload, headers = _signed(event)
+    resp = await client.post("/webhook/stripe", content=payload, headers=headers)
+    assert resp.json() == {"status": "ignored"}
+
+    headers["stripe-signature"] = "t=1,v1=deadbeef"
+    resp = await client.post("/webhook/stripe", content=payload, headers=headers)
+    assert resp.status_code == 400
+
+@pytest.mark.asyncio
+async def test_adhoc_checkout_books_one_session_per_checkout(init_db_and_client):
+    client = init_db_and_client
+
+    u = await client.post("/users", json=UserCreate(email="adhoc@int.com", name="Adhoc").model_dump())
+    uid = u.json()["id"]
+    metadata = {
+        "user_id": str(uid),
+        "start": "2030-03-05T15:00:00+00:00",
+        "end": "2030-03-05T16:00:00+00:00",
+    }
+
+    # two distinct events for the same checkout (e.g. a resend after a timeout)
+    for event_id in ("evt_adhoc_1", "evt_adhoc_2"):
+        event = _checkout_completed(event_id, metadata)
+        event["data"]["object"]["id"] = "cs_adhoc_shared"
+        payload, headers = _signed(event)
+        resp = await client.post("/webhook/stripe", content=payload, headers=headers)
+        assert resp.json() == {"status": "ok"}
+
+    assert await _drain() == 2
+
+    resp = await client.get("/sessions", params={
+        "start": "2030-03-05T00:00:00+00:00",
+        "end": "2030-03-06T00:00:00+00:00",
+    })
+    booked = [s for s in resp.json() if s["session_type"] == "one_on_one"]
+    assert len(booked) == 1
+    assert booked[0]["current_bookings"] == 1
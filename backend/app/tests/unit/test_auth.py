@@ -0,0 +1,109 @@
+import json
+import time
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app import auth, crud, dependencies, schemas
+from app.auth import AuthError, KeySet, KeysUnavailable, verify_token
+from app.cache import TTLCache
+
+def _rsa_key():
+    return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+def _write_jwks(path, *keys):
+    jwks = {"keys": []}
+    for kid, private in keys:
+        jwk = jwt.algorithms.RSAAlgorithm.to_jwk(private.public_key(), as_dict=True)
+        jwks["keys"].append({**jwk, "kid": kid, "use": "sig", "alg": "RS256"})
+    path.write_text(json.dumps(jwks))
+
+def _token(private, kid, email, ttl=300):
+    claims = {"sub": email, "email": email, "exp": int(time.time()) + ttl}
+    return jwt.encode(claims, private, algorithm="RS256", headers={"kid": kid})
+
+def _request(token):
+    return Request({
+        "type": "http",
+        "headers": [(b"authorization", f"Bearer {token}".encode())],
+    })
+
+@pytest.mark.asyncio
+async def test_verify_token_checks_signature_and_expiry(tmp_path):
+    key, other = _rsa_key(), _rsa_key()
+    _write_jwks(tmp_path / "jwks.json", ("k1", key))
+    keys = KeySet(jwks_file=str(tmp_path / "jwks.json"))
+
+    assert (await verify_token(_token(key, "k1", "a@js.com"), keys))["email"] == "a@js.com"
+    with pytest.raises(AuthError):
+        await verify_token(_token(other, "k1", "a@js.com"), keys)          # wrong signer
+    with pytest.raises(AuthError):
+        await verify_token(_token(key, "k1", "a@js.com", ttl=-3600), keys)  # expired
+    with pytest.raises(AuthError):
+        await verify_token("not-a-jwt", keys)
+
+@pytest.mark.asyncio
+async def test_keyset_picks_up_rotated_keys(tmp_path, monkeypatch):
+    monkeypatch.setattr(auth, "UNKNOWN_KID_RELOAD_SECONDS", 0.0)
+    old, new = _rsa_key(), _rsa_key()
+    path = tmp_path / "jwks.json"
+    _write_jwks(path, ("old", old))
+    keys = KeySet(jwks_file=str(path))
+    await verify_token(_token(old, "old", "r@js.com"), keys)
+
+    _write_jwks(path, ("old", old), ("new", new))
+    assert (await verify_token(_token(new, "new", "r@js.com"), keys))["email"] == "r@js.com"
+
+    # a broken file mid-rotation keeps the last good set
+    path.write_text("{")
+    await keys.reload()
+    await verify_token(_token(new, "new", "r@js.com"), keys)
+
+@pytest.mark.asyncio
+async def test_unloadable_key_set_is_a_503_not_a_500(db, tmp_path, monkeypatch):
+    key = _rsa_key()
+    keys = KeySet(jwks_file=str(tmp_path / "missing.json"))
+    with pytest.raises(KeysUnavailable):
+        await verify_token(_token(key, "k1", "a@js.com"), keys)
+
+    monkeypatch.setattr(auth, "keyset", keys)
+    with pytest.raises(HTTPException) as exc:
+        await dependencies.get_current_user(_request(_token(key, "k1", "a@js.com")), db)
+    assert exc.value.status_code == 503
+
+    # once the file shows up, the next request loads it
+    _write_jwks(tmp_path / "missing.json", ("k1", key))
+    assert (await verify_token(_token(key, "k1", "a@js.com"), keys))["email"] == "a@js.com"
+
+def test_ttl_cache_expires_entries():
+    now = [0.0]
+    cache = TTLCache(10, ttl=5, clock=lambda: now[0])
+    cache.set("k", "v")
+    assert cache.get("k") == "v"
+    now[0] = 5.0
+    assert cache.get("k") is None
+    assert len(cache) == 0
+
+@pytest.mark.asyncio
+async def test_current_user_is_cached_after_first_lookup(db, tmp_path, monkeypatch):
+    key = _rsa_key()
+    _write_jwks(tmp_path / "jwks.json", ("k1", key))
+    monkeypatch.setattr(auth, "keyset", KeySet(jwks_file=str(tmp_path / "jwks.json")))
+    monkeypatch.setattr(dependencies, "user_cache", TTLCache(10, ttl=60))
+
+    user = await crud.create_user(db, schemas.UserCreate(email="jwt@js.com", name="Jwt"))
+    token = _token(key, "k1", "jwt@js.com")
+
+    first = await dependencies.get_current_user(_request(token), db)
+    assert (first.id, first.email) == (user.id, "jwt@js.com")
+    # no session at all: a cache hit must not need the database
+    assert await dependencies.get_current_user(_request(token), None) == first
+
+    with pytest.raises(HTTPException) as exc:
+        await dependencies.get_current_user(_request(_token(key, "k1", "nobody@js.com")), db)
+    assert exc.value.status_code == 401
+    with pytest.raises(HTTPException):
+        await dependencies.get_current_user(Request({"type": "http", "headers": []}), db)
@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta, timezone
+
+from app.availability import free_slots, merge_intervals
+
+UTC = timezone.utc
+EST = timezone(timedelta(hours=-5))
+
+
+def test_merge_intervals_collapses_overlaps_and_sorts():
+    a = datetime(2025, 1, 6, 9, tzinfo=UTC)
+    merged = merge_intervals([
+        (a + timedelta(hours=3), a + timedelta(hours=4)),
+        (a, a + timedelta(hours=1)),
+        (a + timedelta(minutes=30), a + timedelta(hours=2)),
+    ])
+    assert merged == [
+        (a, a + timedelta(hours=2)),
+        (a + timedelta(hours=3), a + timedelta(hours=4)),
+    ]
+
+
+def test_free_slots_excludes_booked_hours():
+    day = datetime(2025, 1, 6, tzinfo=UTC)
+    booked = [(day.replace(hour=9), day.replace(hour=10, minute=30))]
+    free = free_slots(day, day + timedelta(days=1), booked)
+
+    starts = [s.start.hour for s in free]
+    assert starts[0] == 6 and starts[-1] == 21
+    assert 9 not in starts and 10 not in starts
+    assert 8 in starts and 11 in starts
+
+
+def test_free_slots_compares_real_timestamps_across_offsets():
+    # 14:00-15:00 UTC is 09:00-10:00 in EST; the EST slot must be blocked
+    day = datetime(2025, 1, 6, tzinfo=EST)
+    booked = [(datetime(2025, 1, 6, 14, tzinfo=UTC), datetime(2025, 1, 6, 15, tzinfo=UTC))]
+    free = free_slots(day, day + timedelta(days=1), booked)
+
+    starts = [s.start.hour for s in free]
+    assert 9 not in starts
+    assert all(s.start.tzinfo == EST for s in free)
+
+
+def test_free_slots_treats_naive_booked_times_as_utc():
+    day = datetime(2025, 1, 6, tzinfo=UTC)
+    booked = [(datetime(2025, 1, 6, 12), datetime(2025, 1, 6, 13))]
+    free = free_slots(day, day + timedelta(days=1), booked)
+    assert 12 not in [s.start.hour for s in free]
@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+
+from app.cache import LRUCache, SingleFlight, SWRCache
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(2)
+    cache.add("a")
+    cache.add("b")
+    assert "a" in cache          # touch a, so b is now the oldest
+    cache.add("c")
+    assert "b" not in cache
+    assert "a" in cache and "c" in cache
+    assert len(cache) == 2
+
+def test_lru_get_set_and_stats():
+    cache = LRUCache(3)
+    cache.set("k", 1)
+    assert cache.get("k") == 1
+    assert cache.get("missing", 0) == 0
+    cache.discard("k")
+    assert cache.get("k") is None
+    assert cache.stats() == {"size": 0, "maxsize": 3, "hits": 1, "misses": 2, "invalidations": 0}
+
+def test_lru_rejects_zero_size():
+    with pytest.raises(ValueError):
+        LRUCache(0)
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.mark.asyncio
+async def test_swr_coalesces_concurrent_misses():
+    cache = SWRCache(4, ttl=10, stale_ttl=60)
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    assert await asyncio.gather(*(cache.get_or_load("k", load) for _ in range(20))) == [1] * 20
+    assert calls == 1
+    assert cache.stats()["coalesced"] == 19
+
+@pytest.mark.asyncio
+async def test_swr_serves_stale_while_one_refresh_runs():
+    clock = Clock()
+    cache = SWRCache(4, ttl=10, stale_ttl=60, clock=clock)
+    versions = iter(range(1, 10))
+    release = asyncio.Event()
+
+    async def load():
+        version = next(versions)
+        if version > 1:
+            await release.wait()
+        return version
+
+    assert await cache.get_or_load("k", load) == 1
+    clock.now = 30                       # stale, not expired
+    assert [await cache.get_or_load("k", load) for _ in range(3)] == [1, 1, 1]
+    assert cache.stats()["loads_in_flight"] == 1
+    release.set()
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    assert await cache.get_or_load("k", load) == 2
+    assert cache.stats()["loads"] == 2 and cache.stats()["stale_hits"] == 3
+
+    clock.now = 1000                     # past the stale window: callers wait
+    assert await cache.get_or_load("k", load) == 3
+
+@pytest.mark.asyncio
+async def test_swr_load_racing_an_invalidation_is_not_kept():
+    cache = SWRCache(4, ttl=10, stale_ttl=60)
+    started, release = asyncio.Event(), asyncio.Event()
+
+    async def old_load():
+        started.set()
+        await release.wait()
+        return "old"
+
+    waiter = asyncio.create_task(cache.get_or_load("k", old_load))
+    await started.wait()
+    cache.invalidate(["k"])
+    release.set()
+    assert await waiter == "old"
+
+    async def new_load():
+        return "new"
+
+    assert await cache.get_or_load("k", new_load) == "new"
+
+@pytest.mark.asyncio
+async def test_single_flight_survives_a_departing_caller():
+    flight = SingleFlight()
+    release = asyncio.Event()
+    runs = 0
+
+    async def slow():
+        nonlocal runs
+        runs += 1
+        await release.wait()
+        return "done"
+
+    leader = asyncio.create_task(flight.do("k", slow, label="demo"))
+    followers = [asyncio.create_task(flight.do("k", slow, label="demo")) for _ in range(3)]
+    await asyncio.sleep(0)
+    leader.cancel()                      # e.g. the first client disconnected
+    release.set()
+    assert await asyncio.gather(*followers) == ["done"] * 3
+    assert runs == 1
+    assert flight.stats() == {"runs": 1, "coalesced": 3, "coalesced_by": {"demo": 3}, "in_flight": 0}
+
+    async def boom():
+        raise RuntimeError("db down")
+
+    with pytest.raises(RuntimeError):
+        await flight.do("k", boom)
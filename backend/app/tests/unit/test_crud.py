@@ -1,6 +1,7 @@
 import pytest
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from app import crud, schemas, models
+from app.events import hub
 from app.models import UserRole
 
 @pytest.mark.asyncio
@@ -58,8 +59,131 @@ async def test_get_nonexistent_booking(db):
     missing = await crud.get_booking(db, -1)
     assert missing is None
 
+@pytest.mark.asyncio
+async def test_signup_bumps_seats_taken_and_repair_fixes_drift(db):
+    user = await crud.create_user(db, schemas.UserCreate(email="seat@js.com", name="Seat"))
+    now = datetime.now(timezone.utc)
+    sess = await crud.create_session(db, schemas.SessionCreate(
+        tutor_id=user.id, session_type=models.SessionType.small_group,
+        start_time=now, end_time=now, max_participants=3,
+    ))
+    assert sess.seats_taken == 0
+
+    for code in ("seat-a", "seat-b"):
+        await crud.create_session_signup(
+            db, schemas.SessionSignupCreate(student_id=user.id, session_id=sess.id), invite_code=code,
+        )
+    await db.refresh(sess)
+    assert sess.seats_taken == 2
+    assert await crud.find_seat_count_drift(db) == []
 
+    sess.seats_taken = 7
+    await db.commit()
+    assert await crud.find_seat_count_drift(db) == [(sess.id, 7, 2)]
 
+    assert await crud.repair_seat_counts(db) == 1
+    await db.refresh(sess)
+    assert sess.seats_taken == 2
+
+@pytest.mark.asyncio
+async def test_reserve_seat_stops_at_capacity(db):
+    user = await crud.create_user(db, schemas.UserCreate(email="rsv@js.com", name="Rsv"))
+    now = datetime.now(timezone.utc)
+    sess = await crud.create_session(db, schemas.SessionCreate(
+        tutor_id=user.id, session_type=models.SessionType.class_group,
+        start_time=now, end_time=now, max_participants=1,
+    ))
+    signup_in = schemas.SessionSignupCreate(student_id=user.id, session_id=sess.id)
 
+    first = await crud.reserve_seat(db, signup_in, "rsv-1", stripe_session_id="cs_rsv_1")
+    assert first.session_id == sess.id
+    assert first.stripe_session_id == "cs_rsv_1"
 
+    assert await crud.reserve_seat(db, signup_in, "rsv-2") is None
+    assert await crud.reserve_seat(
+        db, schemas.SessionSignupCreate(student_id=user.id, session_id=-1), "rsv-3"
+    ) is None
 
+    await db.refresh(sess)
+    assert sess.seats_taken == 1
+    assert await crud.count_session_signups(db, sess.id) == 1
+
+@pytest.mark.asyncio
+async def test_release_expired_holds_frees_unpaid_seats(db):
+    user = await crud.create_user(db, schemas.UserCreate(email="hold@js.com", name="Hold"))
+    now = datetime.now(timezone.utc)
+    sess = await crud.create_session(db, schemas.SessionCreate(
+        tutor_id=user.id, session_type=models.SessionType.class_group,
+        start_time=now, end_time=now, max_participants=4,
+    ))
+    signup_in = schemas.SessionSignupCreate(student_id=user.id, session_id=sess.id)
+    held = await crud.reserve_seat(db, signup_in, "hold-1", stripe_session_id="cs_hold_1")
+    await crud.reserve_seat(db, signup_in, "hold-2", stripe_session_id="cs_hold_2")
+    paid = await crud.reserve_seat(db, signup_in, "hold-3", stripe_session_id="cs_hold_3")
+    await crud.mark_signup_paid(db, paid.id)
+    # no checkout, nothing to wait for: a free signup never holds
+    free = await crud.reserve_seat(db, signup_in, "hold-4")
+    assert held.hold_expires_at is not None
+    assert free.hold_expires_at is None
+
+    # nothing has lapsed yet
+    assert await crud.release_expired_holds(db, now=now) == 0
+
+    # drain in single-row batches, as the reaper would
+    await db.commit()
+    live = hub.subscribe()
+    later = now + timedelta(days=1)
+    while await crud.release_expired_holds(db, now=later, batch_size=1):
+        pass
+    await db.commit()
+    hub.unsubscribe(live)
+    # each batch pushes the count it left behind
+    assert [live.get_nowait()["seats_taken"] for _ in range(live.qsize())] == [3, 2]
+
+    await db.refresh(sess)
+    assert sess.seats_taken == 2
+    assert await crud.get_signup_by_code(db, "hold-3") is not None
+    assert await crud.get_signup_by_code(db, "hold-4") is not None
+    assert await crud.get_signup_by_code(db, "hold-1") is None
+
+@pytest.mark.asyncio
+async def test_one_off_fulfilment_is_idempotent_per_checkout(db):
+    user = await crud.create_user(db, schemas.UserCreate(email="adhoc@js.com", name="Adhoc"))
+    start = datetime(2031, 5, 6, 14, tzinfo=timezone.utc)
+    kwargs = dict(
+        tutor_id=user.id, student_id=user.id,
+        start_dt=start, end_dt=start + timedelta(hours=1),
+        amount_cents=3000, stripe_session_id="cs_adhoc_1",
+    )
+
+    signup, created = await crud.create_one_off_session_and_signup(db, **kwargs)
+    await db.commit()
+    assert created and signup.is_paid
+
+    again, created = await crud.create_one_off_session_and_signup(db, **kwargs)
+    await db.commit()
+    assert not created
+    assert again.id == signup.id
+
+    sessions = await crud.list_sessions_between(
+        db, start, start + timedelta(hours=1), tutor_id=user.id
+    )
+    assert len(sessions) == 1
+    assert sessions[0].seats_taken == 1
+
+    busy = await crud.list_busy_intervals(db, start, start + timedelta(hours=1), tutor_id=user.id)
+    assert [tuple(b) for b in busy] == [(sessions[0].start_time, sessions[0].end_time)]
+
+    join = await crud.get_join_details(db, signup.invite_code)
+    assert join.is_paid and join.session_id == signup.session_id
+    assert join.price_per_seat == 3000
+
+@pytest.mark.asyncio
+async def test_enqueue_webhook_event_without_on_conflict(db, monkeypatch):
+    # a dialect with no ON CONFLICT falls back to INSERT under a savepoint
+    monkeypatch.setattr(db.bind.dialect, "name", "mssql")
+    assert await crud.enqueue_webhook_event(db, "evt_plain", "invoice.paid", {}) is True
+    assert await crud.enqueue_webhook_event(db, "evt_plain", "invoice.paid", {}) is False
+    # the duplicate left the transaction usable
+    assert await crud.get_user(db, -1) is None
+    await db.commit()
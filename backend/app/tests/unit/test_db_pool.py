@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app import crud, schemas
+from app.database import READ_YOUR_WRITES, InstrumentedPool, coalesce_read, prewarm_pool, read_coalescer
+
+@pytest.mark.asyncio
+async def test_pool_reports_usage_and_timeouts(tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedPool,
+        pool_size=2,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    try:
+        await prewarm_pool(engine, 5)   # capped at pool_size
+        stats = engine.pool.stats()
+        assert stats["idle"] == 2
+        assert stats["checked_out"] == 0
+        assert stats["checkouts"] == 2
+
+        held = [await engine.connect() for _ in range(2)]
+        assert engine.pool.stats()["checked_out"] == 2
+        with pytest.raises(PoolTimeout):
+            await engine.connect()
+        for conn in held:
+            await conn.close()
+
+        stats = engine.pool.stats()
+        assert stats["timeouts"] == 1
+        assert stats["wait_ms_max"] >= 50
+        assert stats["idle"] == 2
+    finally:
+        await engine.dispose()
+
+@pytest.mark.asyncio
+async def test_identical_concurrent_reads_share_one_query(db):
+    user = await crud.create_user(db, schemas.UserCreate(email="coalesce@js.com", name="C"))
+    await db.commit()
+    queries = 0
+
+    async def query(session):
+        nonlocal queries
+        queries += 1
+        await asyncio.sleep(0.01)       # still in flight when the others arrive
+        return await crud.get_user(session, user.id)
+
+    before = read_coalescer.stats()["coalesced_by"].get("user", 0)
+    users = await asyncio.gather(*(coalesce_read(db, ("user", user.id), query) for _ in range(10)))
+    assert queries == 1
+    assert {u.email for u in users} == {"coalesce@js.com"}
+    assert read_coalescer.stats()["coalesced_by"]["user"] == before + 9
+
+    # right after its own write a client never joins an older in-flight read
+    queries = 0
+    pinned = [AsyncSession(db.bind, info={READ_YOUR_WRITES: True}) for _ in range(3)]
+    await asyncio.gather(*(coalesce_read(s, ("user", user.id), query) for s in pinned))
+    for s in pinned:
+        await s.close()
+    assert queries == 3
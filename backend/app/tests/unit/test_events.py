@@ -0,0 +1,42 @@
+import pytest
+from sqlalchemy import text
+
+from app.events import RESYNC, EventHub, hub
+from app.invalidation import publish_after_commit
+from app.routers.events import _frame
+
+def test_slow_subscriber_gets_one_resync_instead_of_a_backlog():
+    events = EventHub(queue_size=2)
+    fast, slow = events.subscribe(), events.subscribe()
+    for seats_taken in (1, 2):
+        events.broadcast({"type": "seats", "session_id": 1, "seats_taken": seats_taken})
+    fast.get_nowait(), fast.get_nowait()
+    events.broadcast({"type": "seats", "session_id": 1, "seats_taken": 3})
+
+    assert fast.get_nowait()["seats_taken"] == 3
+    assert slow.get_nowait() == RESYNC and slow.empty()
+    assert events.stats()["overflows"] == 1
+    events.unsubscribe(slow)
+    assert events.stats()["subscribers"] == 1
+
+@pytest.mark.asyncio
+async def test_events_are_delivered_only_after_commit(db):
+    queue = hub.subscribe()
+    try:
+        await db.execute(text("SELECT 1"))
+        publish_after_commit(db, {"type": "seats", "session_id": 5, "seats_taken": 1})
+        await db.rollback()
+        assert queue.empty()
+
+        await db.execute(text("SELECT 1"))
+        publish_after_commit(db, {"type": "seats", "session_id": 5, "seats_taken": 0})
+        assert queue.empty()
+        await db.commit()
+        assert queue.get_nowait() == {"type": "seats", "session_id": 5, "seats_taken": 0}
+    finally:
+        hub.unsubscribe(queue)
+
+def test_sse_frame():
+    assert _frame({"type": "seats", "session_id": 5, "seats_taken": 1}) == (
+        b'event: seats\ndata: {"session_id":5,"seats_taken":1}\n\n'
+    )
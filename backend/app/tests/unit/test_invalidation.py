@@ -0,0 +1,134 @@
+import asyncio
+import json
+from contextlib import suppress
+
+import pytest
+from sqlalchemy import func, select, text
+
+from app import invalidation, models
+from app.cache import LRUCache
+from app.invalidation import invalidate_after_commit, poll_invalidations, register
+
+@pytest.fixture
+def shared(monkeypatch):
+    monkeypatch.setattr(invalidation, "registry", {})
+    return register("test", LRUCache(4))
+
+@pytest.mark.asyncio
+async def test_invalidation_waits_for_the_outer_commit(db):
+    cache = LRUCache(4)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    await db.execute(text("SELECT 1"))
+    invalidate_after_commit(db, cache, ["a"])
+    await db.rollback()
+    assert cache.get("a") == 1          # rolled back: nothing evicted
+
+    await db.begin()
+    async with db.begin_nested():
+        invalidate_after_commit(db, cache, ["a", "b"])
+    assert cache.get("a") == 1          # savepoint released, transaction still open
+    generation = cache.generation
+    await db.commit()
+    assert "a" not in cache and "b" not in cache
+    assert cache.generation == generation + 1
+    assert cache.stats()["invalidations"] == 2
+
+@pytest.mark.asyncio
+async def test_committed_invalidations_reach_other_workers(db, shared, monkeypatch):
+    if db.bind.dialect.name != "sqlite":
+        pytest.skip("poll mode")
+    last_id = await db.scalar(select(func.coalesce(func.max(models.CacheInvalidation.id), 0)))
+
+    await db.execute(text("SELECT 1"))
+    invalidate_after_commit(db, shared, [(1, "2030-01-01")])
+    await db.rollback()                 # never announced
+    invalidate_after_commit(db, shared, [(1, "2030-01-02"), "x"])
+    await db.commit()
+
+    # another worker has both keys cached and polls the message
+    monkeypatch.setattr(invalidation, "WORKER_ID", "other-worker")
+    shared.set((1, "2030-01-01"), 1)
+    shared.set((1, "2030-01-02"), 2)
+    shared.set("x", 3)
+    assert await poll_invalidations(db, last_id) == last_id + 1
+    assert (1, "2030-01-01") in shared
+    assert (1, "2030-01-02") not in shared and "x" not in shared
+
+def test_oversized_messages_clear_the_whole_cache(shared):
+    shared.set("keep?", 1)
+    [payload] = invalidation._messages([(shared, [f"key-{i}" for i in range(2000)])])
+    message = json.loads(payload)
+    assert message["keys"] is None
+    invalidation.apply(json.dumps({**message, "origin": "other-worker"}))
+    assert len(shared) == 0
+
+@pytest.mark.asyncio
+async def test_commit_sends_notify(db, shared):
+    if db.bind.dialect.name != "postgresql":
+        pytest.skip("LISTEN/NOTIFY needs Postgres")
+    raw = await db.bind.raw_connection()
+    received = asyncio.Queue()
+    listener = raw.driver_connection
+    channel = invalidation.settings.CACHE_INVALIDATION_CHANNEL
+    callback = lambda _conn, _pid, _channel, payload: received.put_nowait(payload)
+    await listener.add_listener(channel, callback)
+    try:
+        await db.execute(text("SELECT 1"))
+        invalidate_after_commit(db, shared, ["k"])
+        await db.commit()
+        message = json.loads(await asyncio.wait_for(received.get(), timeout=5))
+        assert message == {"origin": invalidation.WORKER_ID, "cache": "test", "keys": ["k"]}
+    finally:
+        await listener.remove_listener(channel, callback)
+        raw.close()
+
+class _SilentConnection:
+    """A LISTEN connection whose socket went half-open: queries never return."""
+    def __init__(self):
+        self.pinged = asyncio.Event()
+        self.terminated = asyncio.Event()
+        self._on_lost = []
+
+    def add_termination_listener(self, callback):
+        self._on_lost.append(callback)
+
+    async def add_listener(self, *args):
+        pass
+
+    async def execute(self, query):
+        self.pinged.set()
+        await asyncio.Event().wait()
+
+    def terminate(self):
+        self.terminated.set()
+        for callback in self._on_lost:
+            callback(self)
+
+    async def close(self):
+        pass
+
+@pytest.mark.asyncio
+async def test_listener_drops_a_connection_whose_keepalive_hangs(shared, monkeypatch):
+    conn = _SilentConnection()
+
+    async def connect(**kwargs):
+        return conn
+    monkeypatch.setattr(invalidation.asyncpg, "connect", connect)
+    monkeypatch.setattr(invalidation.settings, "CACHE_INVALIDATION_KEEPALIVE_SECONDS", 0.01)
+    monkeypatch.setattr(invalidation.settings, "CACHE_INVALIDATION_RETRY_SECONDS", 60)
+
+    listener = asyncio.create_task(invalidation.run_invalidation_listener())
+    try:
+        await asyncio.wait_for(conn.pinged.wait(), timeout=1)
+        shared.set("k", 1)
+        await asyncio.wait_for(conn.terminated.wait(), timeout=1)
+        await asyncio.sleep(0.01)
+        # gave up on the silent socket and stopped trusting local caches
+        assert "k" not in shared
+        assert not listener.done()
+    finally:
+        listener.cancel()
+        with suppress(asyncio.CancelledError):
+            await listener
@@ -0,0 +1,181 @@
+"""
+Query-plan regression suite.
+
+Every crud/router query is run against a small seeded database while the
+SQL it emits is recorded; each statement is then EXPLAINed and the test
+fails if the plan reads a whole table where an index should be used.
+
+On SQLite a bare "SCAN <table>" is a full table scan ("SCAN ... USING
+INDEX" is an ordered index walk and is fine). On Postgres the check runs
+with enable_seqscan off, so any remaining Seq Scan means no usable index.
+"""
+import json
+import re
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event
+
+from app import crud, invalidation, schemas, models
+from app.database import Base
+from app.routers import classes
+
+T0 = datetime(2032, 1, 5, 9, tzinfo=timezone.utc)
+SQLITE_FULL_SCAN = re.compile(r"^SCAN (\w+)(?: AS \w+)?$")
+
+@pytest_asyncio.fixture(scope="module")
+async def seeded(engine):
+    async with engine.begin() as conn:
+        users = await conn.execute(
+            models.User.__table__.insert().returning(models.User.id),
+            [{"email": f"plan{i}@js.com", "name": f"Plan {i}"} for i in range(3)],
+        )
+        tutor, student, _ = users.scalars().all()
+        sessions = await conn.execute(
+            models.Session.__table__.insert().returning(models.Session.id),
+            [
+                {
+                    "tutor_id": tutor,
+                    "session_type": list(models.SessionType)[i % 3],
+                    "start_time": T0 + timedelta(hours=i),
+                    "end_time": T0 + timedelta(hours=i + 1),
+                    "max_participants": 5,
+                    "seats_taken": 1,
+                }
+                for i in range(30)
+            ],
+        )
+        session_ids = sessions.scalars().all()
+        await conn.execute(models.SessionSignup.__table__.insert(), [
+            {
+                "student_id": student,
+                "session_id": sid,
+                "invite_code": f"plan-{sid}",
+                "is_paid": bool(sid % 2),
+                "stripe_session_id": f"cs_plan_{sid}",
+                "hold_expires_at": None if sid % 2 else T0,
+            }
+            for sid in session_ids
+        ])
+        await conn.execute(models.Booking.__table__.insert(), [
+            {"user_id": student, "session_id": sid, "call_type": "zoom"}
+            for sid in session_ids[:5]
+        ])
+        await conn.execute(models.StripeWebhookEvent.__table__.insert(), [
+            {"event_id": f"evt_plan_{i}", "event_type": "checkout.session.completed",
+             "payload": {}, "attempts": 0}
+            for i in range(5)
+        ])
+    return {"tutor": tutor, "student": student, "session": session_ids[3]}
+
+async def _recorded(db, query) -> list[tuple[str, object]]:
+    """Run query(db) and return the (statement, parameters) it sent."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    sync_engine = db.bind.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", record)
+    try:
+        await query(db)
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", record)
+    return [
+        (stmt, params) for stmt, params in statements
+        if stmt.lstrip().split(None, 1)[0].upper() in ("SELECT", "UPDATE", "DELETE", "WITH", "INSERT")
+    ]
+
+async def _full_scans(db, statement, parameters) -> set[str]:
+    conn = await db.connection()
+    tables = set(Base.metadata.tables)
+    if db.bind.dialect.name == "postgresql":
+        await conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+        plan = result.scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        found, stack = set(), [plan[0]["Plan"]]
+        while stack:
+            node = stack.pop()
+            if node["Node Type"] == "Seq Scan" and node.get("Relation Name") in tables:
+                found.add(node["Relation Name"])
+            stack.extend(node.get("Plans", []))
+        return found
+    result = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+    return {
+        m.group(1) for *_, detail in result.all()
+        if (m := SQLITE_FULL_SCAN.match(detail)) and m.group(1) in tables
+    }
+
+HOT_QUERIES = {
+    "get_user": lambda db, ids: crud.get_user(db, ids["tutor"]),
+    "get_session": lambda db, ids: crud.get_session(db, ids["session"]),
+    "get_booking": lambda db, ids: crud.get_booking(db, 1),
+    "list_sessions_page_window": lambda db, ids: crud.list_sessions_page(
+        db, start=T0, end=T0 + timedelta(days=1), limit=10),
+    "list_sessions_page_after": lambda db, ids: crud.list_sessions_page(
+        db, start=T0, end=T0 + timedelta(days=1), after=(T0 + timedelta(hours=5), 6), limit=10),
+    "list_sessions_page_tutor": lambda db, ids: crud.list_sessions_page(
+        db, start=T0, end=T0 + timedelta(days=1), tutor_id=ids["tutor"], limit=10),
+    "list_sessions_page_type": lambda db, ids: crud.list_sessions_page(
+        db, start=T0, end=T0 + timedelta(days=1),
+        session_type=models.SessionType.class_group, limit=10),
+    "list_sessions_between": lambda db, ids: crud.list_sessions_between(
+        db, T0, T0 + timedelta(days=1), tutor_id=ids["tutor"]),
+    "list_busy_intervals": lambda db, ids: crud.list_busy_intervals(
+        db, T0, T0 + timedelta(days=1), tutor_id=ids["tutor"]),
+    "count_session_signups": lambda db, ids: crud.count_session_signups(db, ids["session"]),
+    "get_signup_by_code": lambda db, ids: crud.get_signup_by_code(db, f"plan-{ids['session']}"),
+    "get_join_details": lambda db, ids: crud.get_join_details(db, f"plan-{ids['session']}"),
+    "get_signup_by_stripe_session_id": lambda db, ids: crud.get_signup_by_stripe_session_id(
+        db, f"cs_plan_{ids['session']}"),
+    "mark_signup_paid": lambda db, ids: crud.mark_signup_paid(db, 1),
+    "mark_signups_paid_by_codes": lambda db, ids: crud.mark_signups_paid_by_codes(
+        db, ["plan-1", "plan-2"]),
+    "reserve_seat": lambda db, ids: crud.reserve_seat(
+        db, schemas.SessionSignupCreate(student_id=ids["student"], session_id=ids["session"]),
+        "plan-new"),
+    "create_session_signup": lambda db, ids: crud.create_session_signup(
+        db, schemas.SessionSignupCreate(student_id=ids["student"], session_id=ids["session"]),
+        "plan-new-2"),
+    "release_expired_holds": lambda db, ids: crud.release_expired_holds(
+        db, now=T0 + timedelta(days=1)),
+    "create_one_off_session_and_signup": lambda db, ids: crud.create_one_off_session_and_signup(
+        db, tutor_id=ids["tutor"], student_id=ids["student"],
+        start_dt=T0 + timedelta(days=30), end_dt=T0 + timedelta(days=30, hours=1),
+        amount_cents=3000, stripe_session_id="cs_plan_new"),
+    "enqueue_webhook_event": lambda db, ids: crud.enqueue_webhook_event(
+        db, "evt_plan_0", "checkout.session.completed", {}),
+    "claim_webhook_events": lambda db, ids: crud.claim_webhook_events(db, 10, 5),
+    "finish_webhook_events": lambda db, ids: crud.finish_webhook_events(db, [1, 2], {3: "boom"}),
+    "list_classes": lambda db, ids: classes.fetch_classes(db),
+    "poll_invalidations": lambda db, ids: invalidation.poll_invalidations(db, 0),
+}
+
+# whole-table by design; their per-row lookups must still be indexed
+MAINTENANCE_QUERIES = {
+    "find_seat_count_drift": (lambda db, ids: crud.find_seat_count_drift(db), {"sessions"}),
+    "repair_seat_counts": (lambda db, ids: crud.repair_seat_counts(db), {"sessions"}),
+}
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+async def test_hot_query_uses_indexes(db, seeded, name):
+    statements = await _recorded(db, lambda s: HOT_QUERIES[name](s, seeded))
+    assert statements, f"{name} issued no statements"
+    for statement, parameters in statements:
+        scans = await _full_scans(db, statement, parameters)
+        assert not scans, f"{name} full-scans {sorted(scans)}:\n{statement}"
+    await db.rollback()
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("name", sorted(MAINTENANCE_QUERIES))
+async def test_maintenance_query_scans_only_its_driving_table(db, seeded, name):
+    query, allowed = MAINTENANCE_QUERIES[name]
+    statements = await _recorded(db, lambda s: query(s, seeded))
+    for statement, parameters in statements:
+        scans = await _full_scans(db, statement, parameters) - allowed
+        assert not scans, f"{name} full-scans {sorted(scans)}:\n{statement}"
+    await db.rollback()
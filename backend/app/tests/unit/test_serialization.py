@@ -0,0 +1,31 @@
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+
+import orjson
+
+from app import crud, models, schemas
+from app.serialization import dumps, json_rows, row_dicts
+
+SessionRow = namedtuple("SessionRow", [c.key for c in crud.SESSION_READ_COLUMNS])
+
+def test_fast_path_rows_match_response_model_output():
+    # aware datetimes, as Postgres returns them: UTC, another offset, microseconds
+    start = datetime(2030, 2, 4, 15, 0, 0, 250_000, tzinfo=timezone.utc)
+    row = SessionRow(
+        id=1, tutor_id=2, session_type=models.SessionType.small_group,
+        title="Algebra", day_of_week=None,
+        start_time=start, end_time=start.astimezone(timezone(timedelta(hours=2))) + timedelta(hours=1),
+        price_per_seat=1500, max_participants=3,
+        zoom_link=None, discord_channel_id=None, discord_invite_link=None,
+        created_at=datetime(2030, 1, 1, tzinfo=timezone.utc), current_bookings=2,
+    )
+
+    listed = orjson.loads(json_rows(row_dicts([row])).body)[0]
+    validated = schemas.SessionRead.model_validate(row._asdict()).model_dump(mode="json")
+    assert listed == validated
+    assert listed["start_time"] == "2030-02-04T15:00:00.250000Z"
+    assert listed["end_time"] == "2030-02-04T18:00:00.250000+02:00"
+
+def test_dumps_writes_utc_with_z():
+    moment = datetime(2030, 2, 4, 15, tzinfo=timezone.utc)
+    assert dumps({"at": moment}) == b'{"at":"2030-02-04T15:00:00Z"}'
@@ -0,0 +1,99 @@
+import asyncio
+import socket
+
+import pytest
+import stripe
+
+from app.stripe_gateway import CircuitBreaker, StripeGateway, StripeUnavailable
+from scripts.fake_stripe import serve_in_thread
+
+@pytest.fixture(scope="module")
+def fake_stripe():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = serve_in_thread(port, latency_ms=200)
+    previous, stripe.api_base = stripe.api_base, f"http://127.0.0.1:{port}"
+    yield server
+    stripe.api_base = previous
+    server.should_exit = True
+
+@pytest.mark.asyncio
+async def test_checkout_runs_off_the_event_loop(fake_stripe):
+    gw = StripeGateway("sk_test_fake", max_concurrency=4)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    task = asyncio.create_task(ticker())
+    sessions = await asyncio.gather(*(
+        gw.create_checkout_session(mode="payment", metadata={"invite_code": f"code-{i}"})
+        for i in range(4)
+    ))
+    task.cancel()
+    gw.close()
+
+    assert [s.metadata["invite_code"] for s in sessions] == [f"code-{i}" for i in range(4)]
+    assert all(s.id.startswith("cs_test_") for s in sessions)
+    # the loop kept running while four 200 ms calls were in flight
+    assert ticks >= 10
+
+@pytest.mark.asyncio
+async def test_breaker_opens_after_repeated_outages_and_recovers(fake_stripe):
+    fake_app = fake_stripe.config.app
+    fake_app.state.latency, fake_app.state.fail_status = 0, 503
+    gw = StripeGateway(
+        "sk_test_fake",
+        max_retries=1,
+        backoff_base=0.001,
+        breaker=CircuitBreaker(failure_threshold=2, reset_timeout=0.2),
+    )
+    try:
+        # one call = first attempt + one retry -> two failures -> breaker opens
+        with pytest.raises(StripeUnavailable):
+            await gw.create_checkout_session(mode="payment")
+        assert gw.stats()["breaker_state"] == "open"
+        assert gw.stats()["retries"] == 1
+
+        # while open, calls are rejected without touching Stripe
+        calls_before = gw.calls
+        with pytest.raises(StripeUnavailable) as exc_info:
+            await gw.create_checkout_session(mode="payment")
+        assert gw.calls == calls_before
+        assert gw.stats()["rejected"] == 1
+        assert exc_info.value.retry_after > 0
+
+        # after the reset timeout a healthy trial call closes it again
+        fake_app.state.fail_status = None
+        await asyncio.sleep(0.25)
+        session = await gw.create_checkout_session(mode="payment")
+        assert session.id.startswith("cs_test_")
+        assert gw.stats()["breaker_state"] == "closed"
+    finally:
+        fake_app.state.latency, fake_app.state.fail_status = 0.2, None
+        gw.close()
+
+@pytest.mark.asyncio
+async def test_cancelled_trial_call_does_not_wedge_the_breaker(fake_stripe):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    gw = StripeGateway("sk_test_fake", breaker=breaker)
+    try:
+        # the half-open trial is cancelled mid-flight (e.g. the client went away)
+        trial = asyncio.create_task(gw.create_checkout_session(mode="payment"))
+        await asyncio.sleep(0.05)
+        assert breaker.state == "half_open"
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+
+        # the next call gets to be the trial instead of being rejected forever
+        session = await gw.create_checkout_session(mode="payment")
+        assert session.id.startswith("cs_test_")
+        assert breaker.state == "closed"
+    finally:
+        gw.close()
@@ -0,0 +1,31 @@
+import pytest
+from fastapi import HTTPException, Response
+
+from app import crud, schemas
+from app.database import get_uow
+from app.models import User
+from sqlalchemy import select
+
+@pytest.mark.asyncio
+async def test_uow_commits_once_on_success(db, engine):
+    uow = get_uow(Response(), db)
+    session = await anext(uow)
+    user = await crud.create_user(session, schemas.UserCreate(email="uow-ok@js.com", name="Ok"))
+    with pytest.raises(StopAsyncIteration):
+        await anext(uow)
+
+    # visible from an unrelated connection, i.e. really committed
+    async with engine.connect() as conn:
+        found = (await conn.execute(select(User.id).where(User.id == user.id))).scalar()
+    assert found == user.id
+
+@pytest.mark.asyncio
+async def test_uow_rolls_back_when_handler_raises(db):
+    uow = get_uow(Response(), db)
+    session = await anext(uow)
+    user = await crud.create_user(session, schemas.UserCreate(email="uow-err@js.com", name="Err"))
+    user_id = user.id  # rollback expires the instance
+    with pytest.raises(HTTPException):
+        await uow.athrow(HTTPException(status_code=400, detail="nope"))
+
+    assert await crud.get_user(db, user_id) is None
@@ -0,0 +1,165 @@
+# backend/app/webhook_worker.py
+"""
+In-process workers that drain the Stripe webhook inbox.
+
+The webhook endpoint only verifies and stores events. Workers claim the
+oldest unprocessed rows in batches (SKIP LOCKED, so workers in any process
+never share a batch), mark every paid invite code in one UPDATE, and stamp
+the batch processed in the same transaction. A payment whose seat hold was
+already reaped re-takes the seat; one that can no longer be fulfilled (the
+seat or the ad-hoc slot is gone) is flagged for a refund, not retried.
+"""
+import asyncio
+import logging
+from contextlib import suppress
+from datetime import datetime
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import settings
+from .database import AsyncSessionLocal
+from . import crud, models, schemas
+
+logger = logging.getLogger(__name__)
+
+# set by the webhook endpoint so idle workers pick new events up immediately
+wakeup = asyncio.Event()
+
+def notify() -> None:
+    wakeup.set()
+
+async def _fulfil_adhoc(db: AsyncSession, checkout: dict, metadata: dict) -> None:
+    start_dt = datetime.fromisoformat(metadata["start"])
+    end_dt   = datetime.fromisoformat(metadata["end"])
+    amount_cents = checkout.get("amount_total")
+    if amount_cents is None:
+        minutes = int((end_dt - start_dt).total_seconds() // 60)
+        amount_cents = settings.PRICE_PER_HOUR_CENTS * minutes // 60
+
+    _, created = await crud.create_one_off_session_and_signup(
+        db,
+        tutor_id=settings.DEFAULT_TUTOR_ID,
+        student_id=int(metadata["user_id"]),
+        start_dt=start_dt,
+        end_dt=end_dt,
+        amount_cents=amount_cents,
+        stripe_session_id=checkout["id"],
+        zoom_link=settings.DEFAULT_ZOOM_LINK,
+        discord_invite_link=settings.DEFAULT_DISCORD_INVITE,
+    )
+    if not created:
+        logger.info("Checkout %s already fulfilled", checkout["id"])
+
+async def _reserve_lapsed(db: AsyncSession, code: str, checkout: dict, metadata: dict) -> str | None:
+    """
+    Re-take the seat for a class checkout paid after its hold was reaped.
+    Returns None once the seat is back, otherwise why the payment needs a refund.
+    """
+    if not (metadata.get("session_id") and metadata.get("student_id")):
+        return f"hold for {code} lapsed before payment; refund {checkout['id']}"
+    async with db.begin_nested():
+        signup = await crud.reserve_seat(
+            db,
+            schemas.SessionSignupCreate(
+                student_id=int(metadata["student_id"]),
+                session_id=int(metadata["session_id"]),
+            ),
+            invite_code=code,
+            is_paid=True,
+            stripe_session_id=checkout["id"],
+        )
+    if signup is None:
+        return f"hold for {code} lapsed and the session is full; refund {checkout['id']}"
+    return None
+
+async def process_batch(db: AsyncSession) -> int:
+    """Process one batch of pending events; returns how many were claimed."""
+    events = await crud.claim_webhook_events(
+        db, settings.WEBHOOK_BATCH_SIZE, settings.WEBHOOK_MAX_ATTEMPTS
+    )
+    # read up front: a rolled-back savepoint may expire the claimed rows
+    tries = {event.id: (event.event_id, event.attempts + 1) for event in events}
+    codes: dict[str, list[models.StripeWebhookEvent]] = {}
+    done: list[int] = []
+    failed: dict[int, str] = {}
+    dead: dict[int, str] = {}
+
+    for event in events:
+        if event.event_type != "checkout.session.completed":
+            done.append(event.id)
+            continue
+        checkout = event.payload["data"]["object"]
+        metadata = checkout.get("metadata") or {}
+
+        # 1) fixed “class” bookings: collected and paid in one UPDATE below
+        if metadata.get("invite_code"):
+            codes.setdefault(metadata["invite_code"], []).append(event)
+
+        # 2) ad-hoc slot bookings, isolated so one failure can't sink the batch
+        elif metadata.get("user_id") and metadata.get("start") and metadata.get("end"):
+            try:
+                async with db.begin_nested():
+                    await _fulfil_adhoc(db, checkout, metadata)
+                done.append(event.id)
+            except crud.SlotTaken as exc:
+                refund = f"{exc}; refund {checkout['id']}"
+                logger.error("Stripe checkout %s needs a refund: %s", checkout["id"], refund)
+                dead[event.id] = refund
+            except Exception as exc:
+                logger.exception("Stripe event %s failed", event.event_id)
+                failed[event.id] = repr(exc)
+        else:
+            done.append(event.id)
+
+    paid = await crud.mark_signups_paid_by_codes(db, list(codes))
+    for code, code_events in codes.items():
+        event_ids = [e.id for e in code_events]
+        if code not in paid:
+            # the hold lapsed before Stripe told us about the payment
+            checkout = code_events[0].payload["data"]["object"]
+            try:
+                refund = await _reserve_lapsed(db, code, checkout, checkout.get("metadata") or {})
+            except Exception as exc:
+                logger.exception("Re-reserving seat for %s failed", code)
+                failed.update(dict.fromkeys(event_ids, repr(exc)))
+                continue
+            if refund:
+                logger.error("Stripe checkout %s needs a refund: %s", checkout["id"], refund)
+                dead.update(dict.fromkeys(event_ids, refund))
+                continue
+        done.extend(event_ids)
+
+    # out of attempts: claim_webhook_events would silently skip it from now on
+    for event_id, error in list(failed.items()):
+        stripe_id, attempts = tries[event_id]
+        if attempts >= settings.WEBHOOK_MAX_ATTEMPTS:
+            reason = f"gave up after {attempts} attempts: {failed.pop(event_id)}"
+            logger.error("Stripe event %s %s", stripe_id, reason)
+            dead[event_id] = reason
+
+    await crud.finish_webhook_events(db, done, failed, dead)
+    await db.commit()
+    return len(events)
+
+async def drain() -> int:
+    """Process batches until the inbox is empty; returns events handled."""
+    total = 0
+    async with AsyncSessionLocal() as db:
+        while True:
+            claimed = await process_batch(db)
+            total += claimed
+            if claimed < settings.WEBHOOK_BATCH_SIZE:
+                return total
+
+async def run_webhook_worker() -> None:
+    """Drain on every wake-up, and at least every WEBHOOK_POLL_INTERVAL_SECONDS."""
+    while True:
+        wakeup.clear()
+        try:
+            await drain()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Stripe webhook worker pass failed")
+        with suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(wakeup.wait(), timeout=settings.WEBHOOK_POLL_INTERVAL_SECONDS)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Memory and CPU of the read paths: ORM entities vs Core rows.
+
+Seeds one tutor with N sessions, then loads them the way the listing and
+availability endpoints used to (ORM objects through the identity map) and
+the way they do now (crud's column selects, returning Core rows). Each
+variant runs in a fresh AsyncSession; peak Python allocation is measured
+with tracemalloc and CPU with process_time, both around query + shaping.
+
+    python -m scripts.bench_read_paths --rows 50000
+    python -m scripts.bench_read_paths --url sqlite+aiosqlite:///bench.db
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, models
+from app.config import settings
+from app.database import Base
+from app.serialization import row_dicts
+
+SESSION_FIELDS = [c.key for c in crud.SESSION_READ_COLUMNS]
+
+async def _seed(SessionLocal, n_rows: int) -> tuple[int, datetime, datetime]:
+    # a fresh tutor far in the future so runs never collide
+    start = datetime.now(timezone.utc).replace(microsecond=0) + timedelta(days=3650)
+    async with SessionLocal() as db:
+        tutor = await db.scalar(
+            models.User.__table__.insert()
+            .values(email=f"bench-{uuid4().hex}@example.com", name="Bench")
+            .returning(models.User.id)
+        )
+        for offset in range(0, n_rows, 5000):
+            await db.execute(models.Session.__table__.insert(), [
+                {
+                    "tutor_id": tutor,
+                    "session_type": list(models.SessionType)[i % 3],
+                    "title": f"Session {i}",
+                    "start_time": start + timedelta(minutes=30 * i),
+                    "end_time": start + timedelta(minutes=30 * i + 25),
+                    "price_per_seat": 3000,
+                    "max_participants": 5,
+                    "seats_taken": i % 5,
+                    "zoom_link": "https://zoom.example/j/123",
+                }
+                for i in range(offset, min(offset + 5000, n_rows))
+            ])
+        await db.commit()
+    return tutor, start, start + timedelta(minutes=30 * n_rows)
+
+async def _orm_listing(db, tutor, start, end, n_rows):
+    result = await db.execute(
+        select(models.Session)
+        .where(models.Session.tutor_id == tutor,
+               models.Session.start_time >= start, models.Session.start_time < end)
+        .order_by(models.Session.start_time, models.Session.id)
+        .limit(n_rows)
+    )
+    return [
+        {f: getattr(s, "seats_taken" if f == "current_bookings" else f) for f in SESSION_FIELDS}
+        for s in result.scalars().all()
+    ]
+
+async def _core_listing(db, tutor, start, end, n_rows):
+    rows = await crud.list_sessions_page(db, start=start, end=end, tutor_id=tutor, limit=n_rows)
+    return row_dicts(rows)
+
+async def _orm_busy(db, tutor, start, end, n_rows):
+    booked = await crud.list_sessions_between(db, start, end, tutor_id=tutor)
+    return [(s.start_time, s.end_time) for s in booked]
+
+async def _core_busy(db, tutor, start, end, n_rows):
+    return await crud.list_busy_intervals(db, start, end, tutor_id=tutor)
+
+async def _measure(SessionLocal, fn, args, repeat: int) -> tuple[float, float, int]:
+    cpu, peak, count = [], [], 0
+    for _ in range(repeat):
+        async with SessionLocal() as db:
+            tracemalloc.start()
+            began = time.process_time()
+            out = await fn(db, *args)
+            cpu.append((time.process_time() - began) * 1000)
+            peak.append(tracemalloc.get_traced_memory()[1] / 2**20)
+            tracemalloc.stop()
+            count = len(out)
+            del out
+    return statistics.median(cpu), statistics.median(peak), count
+
+async def main(url: str, n_rows: int, repeat: int) -> None:
+    engine = create_async_engine(url)
+    SessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    tutor, start, end = await _seed(SessionLocal, n_rows)
+    args = (tutor, start, end, n_rows)
+
+    print(f"rows: {n_rows}  (median of {repeat}, {engine.dialect.name})")
+    for name, before, after in (
+        ("listing", _orm_listing, _core_listing),
+        ("availability", _orm_busy, _core_busy),
+    ):
+        b_cpu, b_mem, b_n = await _measure(SessionLocal, before, args, repeat)
+        a_cpu, a_mem, a_n = await _measure(SessionLocal, after, args, repeat)
+        assert a_n == b_n == n_rows, (a_n, b_n)
+        print(f"{name}:")
+        print(f"  orm:   {b_cpu:8.1f} ms CPU  {b_mem:7.1f} MiB peak")
+        print(f"  core:  {a_cpu:8.1f} ms CPU  {a_mem:7.1f} MiB peak")
+        print(f"  cpu {b_cpu / a_cpu:.1f}x less, memory {b_mem / a_mem:.1f}x less")
+    await engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ORM vs Core read path benchmark")
+    parser.add_argument("--url", default=str(settings.DATABASE_URL))
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.url, args.rows, args.repeat))
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Concurrency benchmark for seat reservation through POST /book-session.
+
+Fires N concurrent bookings at one session with C seats and checks that
+exactly C succeed, that seats_taken matches the signup rows, and reports
+throughput.
+
+    python -m scripts.bench_reserve_seat --requests 200 --capacity 50
+    python -m scripts.bench_reserve_seat --url sqlite+aiosqlite:///bench.db
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, models, schemas
+from app.config import settings
+from app.database import Base, get_db
+from app.main import app
+
+async def main(url: str, n_requests: int, capacity: int) -> int:
+    engine = create_async_engine(url)
+    SessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async def override_db():
+        async with SessionLocal() as session:
+            yield session
+    app.dependency_overrides[get_db] = override_db
+
+    # fresh tutor + session far in the future so runs never collide
+    async with SessionLocal() as db:
+        tutor = await crud.create_user(
+            db, schemas.UserCreate(email=f"bench-{uuid4().hex}@example.com", name="Bench")
+        )
+        start = datetime.now(timezone.utc) + timedelta(days=3650)
+        sess = await crud.create_session(db, schemas.SessionCreate(
+            tutor_id=tutor.id,
+            session_type=models.SessionType.class_group,
+            start_time=start,
+            end_time=start + timedelta(hours=1),
+            max_participants=capacity,
+        ))
+        await db.commit()
+
+    payload = {"student_id": tutor.id, "session_id": sess.id}
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+        began = time.perf_counter()
+        responses = await asyncio.gather(
+            *(client.post("/book-session", json=payload) for _ in range(n_requests))
+        )
+        elapsed = time.perf_counter() - began
+
+    ok   = sum(r.status_code == 201 for r in responses)
+    full = sum(r.status_code == 400 for r in responses)
+    other = n_requests - ok - full
+
+    async with SessionLocal() as db:
+        stored = (await crud.get_session(db, sess.id)).seats_taken
+        actual = await crud.count_session_signups(db, sess.id)
+    await engine.dispose()
+
+    print(f"requests:    {n_requests} concurrent, capacity {capacity}")
+    print(f"booked:      {ok}   rejected full: {full}   other: {other}")
+    print(f"seats_taken: {stored}   signup rows: {actual}")
+    print(f"elapsed:     {elapsed:.3f}s   throughput: {n_requests / elapsed:.0f} req/s")
+
+    overbooked = max(actual - capacity, 0)
+    print(f"overbooked:  {overbooked}")
+    return 0 if (ok == capacity == stored == actual and other == 0) else 1
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seat reservation concurrency benchmark")
+    parser.add_argument("--url", default=str(settings.DATABASE_URL))
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--capacity", type=int, default=50)
+    args = parser.parse_args()
+    raise SystemExit(asyncio.run(main(args.url, args.requests, args.capacity)))
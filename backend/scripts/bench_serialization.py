@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Measure response serialization CPU for large session listings.
+
+"before" is what FastAPI does with a List[SessionRead] response_model:
+validate every ORM object into the model, dump it to JSON-able Python and
+encode with the stdlib json module. "after" is app.serialization: the
+Core rows crud.list_sessions_page returns, as plain dicts straight into
+orjson. No database or HTTP is involved; the inputs are transient Session
+objects and equivalent named tuples, so only serialization is timed.
+
+    python -m scripts.bench_serialization --rows 10000 --repeat 5
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app import crud, models, schemas
+from app.serialization import json_rows, row_dicts
+
+SessionRow = namedtuple("SessionRow", [c.key for c in crud.SESSION_READ_COLUMNS])
+
+def _sessions(n: int) -> list[models.Session]:
+    start = datetime(2030, 1, 7, 9, tzinfo=timezone.utc)
+    return [
+        models.Session(
+            id=i,
+            tutor_id=1 + i % 7,
+            session_type=list(models.SessionType)[i % 3],
+            title=f"Session {i}",
+            day_of_week=i % 7,
+            start_time=start + timedelta(hours=i),
+            end_time=start + timedelta(hours=i + 1),
+            price_per_seat=3000,
+            max_participants=5,
+            seats_taken=i % 5,
+            zoom_link="https://zoom.example/j/123",
+            discord_channel_id=None,
+            discord_invite_link=None,
+            created_at=start,
+        )
+        for i in range(n)
+    ]
+
+def _rows(sessions: list[models.Session]) -> list[SessionRow]:
+    return [
+        SessionRow(*(getattr(s, "seats_taken" if f == "current_bookings" else f) for f in SessionRow._fields))
+        for s in sessions
+    ]
+
+async def _before(rows, field) -> bytes:
+    content = await serialize_response(field=field, response_content=rows)
+    return JSONResponse(content).body
+
+async def _after(rows) -> bytes:
+    return json_rows(row_dicts(rows)).body
+
+async def _cpu_ms(fn, repeat: int) -> tuple[float, int]:
+    samples, size = [], 0
+    for _ in range(repeat):
+        began = time.process_time()
+        size = len(await fn())
+        samples.append((time.process_time() - began) * 1000)
+    return statistics.median(samples), size
+
+async def main(n_rows: int, repeat: int) -> None:
+    sessions = _sessions(n_rows)
+    rows = _rows(sessions)
+    field = create_model_field(name="Response", type_=List[schemas.SessionRead], mode="serialization")
+
+    before_ms, before_size = await _cpu_ms(lambda: _before(sessions, field), repeat)
+    after_ms, after_size = await _cpu_ms(lambda: _after(rows), repeat)
+
+    per_10k = 10_000 / n_rows
+    print(f"rows:    {n_rows}  (median of {repeat})")
+    print(f"before:  {before_ms:8.1f} ms CPU  ({before_ms * per_10k:.1f} ms / 10k rows, {before_size} bytes)")
+    print(f"after:   {after_ms:8.1f} ms CPU  ({after_ms * per_10k:.1f} ms / 10k rows, {after_size} bytes)")
+    print(f"speedup: {before_ms / after_ms:.1f}x")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Listing serialization benchmark")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.repeat))
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Measure how in-flight Stripe checkouts affect latency of unrelated endpoints.
+
+Starts scripts/fake_stripe.py with artificial latency, fires a burst of
+POST /create-checkout-session requests, and meanwhile probes GET /users/1
+on the same event loop. --blocking runs the SDK call inline (the old
+behaviour) for comparison.
+
+    python -m scripts.bench_stripe_offload --checkouts 32 --latency-ms 300
+    python -m scripts.bench_stripe_offload --blocking
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import stripe
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, schemas
+from app.auth import CurrentUser
+from app.database import Base, get_db
+from app.dependencies import get_current_user
+from app.main import app
+from app.stripe_gateway import gateway
+from scripts.fake_stripe import serve_in_thread
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+async def main(checkouts: int, latency_ms: int, blocking: bool, port: int) -> None:
+    server = serve_in_thread(port, latency_ms)
+    stripe.api_base = f"http://127.0.0.1:{port}"
+
+    if blocking:
+        # reproduce the old behaviour: SDK call directly on the event loop
+        async def inline_call(fn, /, **params):
+            return fn(api_key=gateway.api_key, **params)
+        gateway._call = inline_call
+
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    SessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with SessionLocal() as db:
+        user = await crud.create_user(db, schemas.UserCreate(email="bench@example.com", name="Bench"))
+        await db.commit()
+
+    async def override_db():
+        async with SessionLocal() as session:
+            yield session
+    app.dependency_overrides[get_db] = override_db
+    # no token issuer here; authenticate every request as the bench user
+    bench_user = CurrentUser(id=user.id, email=user.email, name=user.name, role=user.role)
+    app.dependency_overrides[get_current_user] = lambda: bench_user
+
+    payload = {"start": "2030-01-07T15:00:00+00:00", "end": "2030-01-07T16:00:00+00:00"}
+    probe_latencies: list[float] = []
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        async def probe(stop: asyncio.Event):
+            while not stop.is_set():
+                began = time.perf_counter()
+                await client.get("/users/1")
+                probe_latencies.append((time.perf_counter() - began) * 1000)
+                await asyncio.sleep(0.005)
+
+        stop = asyncio.Event()
+        prober = asyncio.create_task(probe(stop))
+        began = time.perf_counter()
+        results = await asyncio.gather(
+            *(client.post("/create-checkout-session", json=payload) for _ in range(checkouts))
+        )
+        elapsed = time.perf_counter() - began
+        stop.set()
+        await prober
+
+    server.should_exit = True
+    await engine.dispose()
+
+    ok = sum(r.status_code == 200 for r in results)
+    mode = "inline (blocking)" if blocking else f"thread pool (max {gateway.max_concurrency})"
+    print(f"stripe calls:  {mode}, {latency_ms} ms fake latency")
+    print(f"checkouts:     {ok}/{checkouts} ok in {elapsed:.2f}s")
+    print(f"probe samples: {len(probe_latencies)}")
+    print(f"probe p50:     {statistics.median(probe_latencies):.1f} ms")
+    print(f"probe p99:     {_percentile(probe_latencies, 0.99):.1f} ms")
+    print(f"probe max:     {max(probe_latencies):.1f} ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stripe offload latency benchmark")
+    parser.add_argument("--checkouts", type=int, default=32)
+    parser.add_argument("--latency-ms", type=int, default=300)
+    parser.add_argument("--port", type=int, default=12111)
+    parser.add_argument("--blocking", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(main(args.checkouts, args.latency_ms, args.blocking, args.port))
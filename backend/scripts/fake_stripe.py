@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Minimal local stand-in for the Stripe API, for tests and benchmarks.
+
+Implements just the checkout-session endpoints the app uses, with a
+configurable artificial latency and an optional forced error status (to
+exercise retries and the circuit breaker). Point the app at it with
+STRIPE_API_BASE=http://127.0.0.1:12111.
+
+    python -m scripts.fake_stripe --port 12111 --latency-ms 300
+    python -m scripts.fake_stripe --fail-status 503
+"""
+import argparse
+import asyncio
+import re
+import threading
+import time
+from urllib.parse import parse_qsl
+from uuid import uuid4
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+def _unflatten(pairs: list[tuple[str, str]]) -> dict:
+    """Turn Stripe's form encoding (metadata[k]=v) back into nested dicts."""
+    out: dict = {}
+    for key, value in pairs:
+        parts = re.findall(r"[^\[\]]+", key)
+        node = out
+        for part in parts[:-1]:
+            node = node.setdefault(part, {})
+        node[parts[-1]] = value
+    return out
+
+def create_app(latency_ms: int = 0, fail_status: int | None = None) -> FastAPI:
+    app = FastAPI(title="Fake Stripe")
+    app.state.latency = latency_ms / 1000
+    app.state.fail_status = fail_status   # mutable at runtime from tests
+    app.state.sessions = {}
+
+    @app.post("/v1/checkout/sessions")
+    async def create_checkout_session(request: Request):
+        await asyncio.sleep(app.state.latency)
+        if app.state.fail_status:
+            return JSONResponse(
+                {"error": {"type": "api_error", "message": "Fake Stripe outage"}},
+                status_code=app.state.fail_status,
+            )
+        params = _unflatten(parse_qsl((await request.body()).decode()))
+        cs_id = f"cs_test_{uuid4().hex}"
+        obj = {
+            "id": cs_id,
+            "object": "checkout.session",
+            "url": f"https://checkout.stripe.test/pay/{cs_id}",
+            "mode": params.get("mode", "payment"),
+            "status": "open",
+            "payment_status": "unpaid",
+            "metadata": params.get("metadata", {}),
+            "expires_at": int(params.get("expires_at", time.time() + 86400)),
+            "success_url": params.get("success_url"),
+            "cancel_url": params.get("cancel_url"),
+            "created": int(time.time()),
+        }
+        app.state.sessions[cs_id] = obj
+        return obj
+
+    @app.get("/v1/checkout/sessions/{cs_id}")
+    async def retrieve_checkout_session(cs_id: str):
+        await asyncio.sleep(app.state.latency)
+        obj = app.state.sessions.get(cs_id)
+        if obj is None:
+            return JSONResponse(
+                {"error": {"type": "invalid_request_error", "message": f"No such checkout.session: '{cs_id}'"}},
+                status_code=404,
+            )
+        return obj
+
+    return app
+
+def serve_in_thread(
+    port: int = 12111, latency_ms: int = 0, fail_status: int | None = None
+) -> uvicorn.Server:
+    """Start the fake server on a daemon thread; call .should_exit = True to stop."""
+    server = uvicorn.Server(uvicorn.Config(
+        create_app(latency_ms, fail_status), host="127.0.0.1", port=port, log_level="warning",
+    ))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake Stripe API server")
+    parser.add_argument("--port", type=int, default=12111)
+    parser.add_argument("--latency-ms", type=int, default=0)
+    parser.add_argument("--fail-status", type=int, default=None)
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.latency_ms, args.fail_status), host="127.0.0.1", port=args.port)
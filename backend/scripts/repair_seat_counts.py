@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Verify or repair sessions.seats_taken against the session_signups table.
+
+    python -m scripts.repair_seat_counts --verify   # report drift, exit 1 if any
+    python -m scripts.repair_seat_counts            # recompute drifted counters
+"""
+import argparse
+import asyncio
+import sys
+
+from app.database import AsyncSessionLocal
+from app.crud import find_seat_count_drift, repair_seat_counts
+
+async def main(verify_only: bool) -> int:
+    async with AsyncSessionLocal() as db:
+        drift = await find_seat_count_drift(db)
+        for session_id, stored, actual in drift:
+            print(f"session {session_id}: seats_taken={stored} signups={actual}")
+        if verify_only:
+            print(f"{len(drift)} session(s) out of sync")
+            return 1 if drift else 0
+        fixed = await repair_seat_counts(db)
+        await db.commit()
+        print(f"Repaired {fixed} session(s)")
+        return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--verify", action="store_true", help="only report drift")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.verify)))
@@ -3,6 +3,7 @@
 
 import React, { useMemo, useState, useCallback, useRef } from 'react';
 import FullCalendar, {
+  DatesSetArg,
   DateSelectArg,
   DateClickArg,
   EventClickArg,
@@ -14,15 +15,26 @@ import timeGridPlugin from '@fullcalendar/timegrid';
 import dayGridPlugin  from '@fullcalendar/daygrid';
 import interactionPlugin from '@fullcalendar/interaction';
 import api from '@/lib/api';
-import { useBookingEvents } from '@/hooks/useBookingEvents';
+import { useBookingEvents, type VisibleRange } from '@/hooks/useBookingEvents';
 import type { BookingEvent } from '@/types/calendar';
 
 const PRICE_PER_HOUR_CENTS = 3000;   // UI hint; backend is source of truth
 const PENDING_ID = '__pending__';
 const ALLOWED_DURATIONS = [60, 90, 120]; // minutes — no 30m option
 
+// initial timeGridWeek window (FullCalendar weeks start on Sunday); datesSet refines it
+const currentWeek = (): VisibleRange => {
+  const start = new Date();
+  start.setHours(0, 0, 0, 0);
+  start.setDate(start.getDate() - start.getDay());
+  const end = new Date(start);
+  end.setDate(end.getDate() + 7);
+  return { start: start.toISOString(), end: end.toISOString() };
+};
+
 export default function BookingCalendar() {
-  const { events: bookingEvents, isLoading, error, reload } = useBookingEvents();
+  const [range, setRange] = useState<VisibleRange>(currentWeek);
+  const { events: bookingEvents, isLoading, error, reload } = useBookingEvents(range);
 
   const calRef = useRef<any>(null); // FullCalendar ref
 
@@ -146,6 +158,11 @@ export default function BookingCalendar() {
 
   const clearPending = useCallback(() => setPending(null), []);
 
+  // only fetch sessions for the week/month currently on screen
+  const handleDatesSet = useCallback((arg: DatesSetArg) => {
+    setRange({ start: arg.start.toISOString(), end: arg.end.toISOString() });
+  }, []);
+
   const confirmPending = useCallback(async () => {
     if (!pending?.start || !pending?.end) return;
     setSubmitting(true);
@@ -311,6 +328,7 @@ export default function BookingCalendar() {
           eventClick={handleEventClick}
           eventChange={handleEventChange}
           eventAllow={eventAllow}
+          datesSet={handleDatesSet}
           editable
           eventResizableFromStart
 
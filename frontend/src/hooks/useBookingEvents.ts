@@ -1,18 +1,144 @@
 /* tutoring-platform/frontend/src/hooks/useBookingEvents.ts */
 'use client';
 
-import { useCallback, useMemo } from 'react';
+import { useCallback, useEffect, useMemo, useRef, useState } from 'react';
 import useSWR, { useSWRConfig } from 'swr';
 import api from '@/lib/api';
 import type { SessionDTO, ClassDTO, BookingEvent } from '@/types/calendar';
 
 const fetcher = <T,>(url: string) => api.get<T>(url).then(res => res.data);
 
-export function useBookingEvents() {
+// /sessions is keyset-paginated; follow X-Next-Cursor until the window is drained
+const fetchAllSessions = async (url: string) => {
+  const rows: SessionDTO[] = [];
+  let cursor: string | undefined;
+  do {
+    const res = await api.get<SessionDTO[]>(url, { params: cursor ? { cursor } : undefined });
+    rows.push(...res.data);
+    cursor = res.headers['x-next-cursor'];
+  } while (cursor);
+  return rows;
+};
+
+// Live updates pushed by the API (GET /events, server-sent events)
+type SeatsEvent   = { session_id: number; seats_taken: number };
+type SessionEvent = { session: SessionDTO & { session_type: string; title: string | null; day_of_week: number | null } };
+
+// Lists are loaded once and then kept current by /events, so no refetch on focus or reconnect
+const LIVE = { revalidateOnFocus: false, revalidateOnReconnect: false } as const;
+
+const inRange = (iso: string, range?: VisibleRange) =>
+  !range || (iso >= range.start && iso < range.end);
+
+export interface VisibleRange {
+  start: string; // ISO
+  end: string;   // ISO
+}
+
+// lay pushed seat counts over a list loaded from the API
+const withSeats = <T extends { id: number | string; current_bookings?: number }>(
+  rows: T[],
+  seats: Map<string, number>,
+) =>
+  rows.map((r) => {
+    const n = seats.get(String(r.id));
+    return n === undefined ? r : { ...r, current_bookings: n };
+  });
+
+export function useBookingEvents(range?: VisibleRange) {
   const { mutate } = useSWRConfig();
 
-  const { data: sessions, error: sessErr } = useSWR<SessionDTO[]>('/sessions', fetcher);
-  const { data: classes,  error: classErr } = useSWR<ClassDTO[]>('/classes',   fetcher);
+  // latest pushed seat count per session; laid over every load, so an event
+  // that beats the load, or a snapshot from a lagging replica, can't undo it
+  const seats = useRef(new Map<string, number>());
+
+  // subscribe first, load second: nothing committed after the snapshot is missed
+  const [subscribed, setSubscribed] = useState(false);
+
+  const sessionsKey = range
+    ? `/sessions?start=${encodeURIComponent(range.start)}&end=${encodeURIComponent(range.end)}&limit=500`
+    : '/sessions?limit=500';
+
+  const { data: sessions, error: sessErr } = useSWR<SessionDTO[]>(
+    subscribed ? sessionsKey : null,
+    (url: string) => fetchAllSessions(url).then((rows) => withSeats(rows, seats.current)),
+    { keepPreviousData: true, ...LIVE },
+  );
+  const { data: classes,  error: classErr } = useSWR<ClassDTO[]>(
+    subscribed ? '/classes' : null,
+    (url: string) => fetcher<ClassDTO[]>(url).then((rows) => withSeats(rows, seats.current)),
+    LIVE,
+  );
+
+  // one stream per mount; handlers read the current window through a ref
+  const view = useRef({ sessionsKey, range });
+  view.current = { sessionsKey, range };
+
+  // apply pushed seat counts and new sessions to the cached lists in place
+  useEffect(() => {
+    const source = new EventSource(`${process.env.NEXT_PUBLIC_API_BASE_URL ?? ''}/events`);
+    let connected = false;
+
+    const resync = () => {
+      // a fresh load is newer than anything pushed before it
+      seats.current.clear();
+      mutate(view.current.sessionsKey);
+      mutate('/classes');
+    };
+
+    // first open starts the loads; after a dropped connection we may have missed events: reload once
+    source.onopen = () => {
+      if (connected) resync();
+      connected = true;
+      setSubscribed(true);
+    };
+    // no stream at all: still load, just without live updates
+    source.onerror = () => {
+      if (!connected) setSubscribed(true);
+    };
+
+    source.addEventListener('seats', (e) => {
+      const { session_id, seats_taken } = JSON.parse((e as MessageEvent).data) as SeatsEvent;
+      seats.current.set(String(session_id), seats_taken);
+      mutate<SessionDTO[]>(
+        view.current.sessionsKey,
+        (rows) => rows && withSeats(rows, seats.current),
+        { revalidate: false },
+      );
+      mutate<ClassDTO[]>(
+        '/classes',
+        (rows) => rows && withSeats(rows, seats.current),
+        { revalidate: false },
+      );
+    });
+
+    source.addEventListener('session', (e) => {
+      const { session } = JSON.parse((e as MessageEvent).data) as SessionEvent;
+      if (session.session_type === 'class_group') {
+        mutate<ClassDTO[]>(
+          '/classes',
+          (rows) => rows && [...rows, {
+            ...session,
+            id:          String(session.id),
+            title:       session.title ?? '',
+            day_of_week: session.day_of_week ?? 0,
+          }],
+          { revalidate: false },
+        );
+      }
+      if (!inRange(new Date(session.start_time).toISOString(), view.current.range)) return;
+      mutate<SessionDTO[]>(
+        view.current.sessionsKey,
+        (rows) => rows && [...rows.filter((s) => s.id !== session.id), session]
+          .sort((a, b) => Date.parse(a.start_time) - Date.parse(b.start_time)),
+        { revalidate: false },
+      );
+    });
+
+    source.addEventListener('resync', resync);
+
+    return () => source.close();
+  }, [mutate]);
 
   const events = useMemo<BookingEvent[]>(() => {
     const evs: BookingEvent[] = [];
@@ -59,9 +185,9 @@ export function useBookingEvents() {
   }, [sessions, classes]);
 
   const reload = useCallback(() => {
-    mutate('/sessions');
+    mutate(sessionsKey);
     mutate('/classes');
-  }, [mutate]);
+  }, [mutate, sessionsKey]);
 
   return {
     events,